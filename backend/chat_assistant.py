@@ -1,20 +1,24 @@
-from haystack.nodes import PromptNode, PromptTemplate
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Iterator, Union
 import requests
 from bs4 import BeautifulSoup
+import math
 import re
+from collections import Counter
 from urllib.parse import urlparse
-from config import LLM_MODEL
+from config import CHAT_INFERENCE_BACKEND, CHAT_MODEL, CHAT_MAX_NEW_TOKENS
 from backend.core import tamer
-import googleapiclient.discovery
-import googleapiclient.errors
-from haystack.nodes import PromptNode
+from backend.model_registry import PromptInvoker
+from backend.token_packing import pack_chunks, prompt_budget
+from backend.warmup import is_ready
 
-summary_prompt = PromptNode(
-    model_name_or_path=LLM_MODEL,
-    default_prompt_template=PromptTemplate(
-        "Summarize the following document: {documents}"
-    )
+summary_prompt = PromptInvoker(
+    "Summarize the following document: {documents}",
+    model_name=CHAT_MODEL, backend=CHAT_INFERENCE_BACKEND, feature="chat"
+)
+chat_prompt = PromptInvoker(
+    "Answer the question using the following context. Context: {documents} Question: {question}",
+    model_name=CHAT_MODEL, backend=CHAT_INFERENCE_BACKEND, feature="chat",
+    max_new_tokens=CHAT_MAX_NEW_TOKENS
 )
 
 def fetch_webpage_content(url: str) -> str:
@@ -51,6 +55,7 @@ def get_youtube_captions(youtube_url: str) -> str:
         if not DEVELOPER_KEY:
             return "YouTube API key not configured"
             
+        import googleapiclient.discovery
         youtube = googleapiclient.discovery.build(
             api_service_name, api_version, developerKey=DEVELOPER_KEY)
             
@@ -105,4 +110,38 @@ def summarize_content(content: str = None, url: str = None) -> str:
     
     if isinstance(summary, dict) and "results" in summary:
         return summary["results"][0]
-    return "Failed to generate summary."
\ No newline at end of file
+    return "Failed to generate summary."
+
+def _terms(text: str) -> set:
+    return set(re.findall(r"\w{3,}", text.lower()))
+
+def rank_chunks(question: str, chunks: List[str]) -> List[str]:
+    """Orders chunks by how many of the question's rarer words they contain."""
+    chunk_terms = [_terms(chunk) for chunk in chunks]
+    frequency = Counter(term for words in chunk_terms for term in words)
+    weight = {term: math.log(1 + len(chunks) / frequency[term]) for term in _terms(question) if frequency[term]}
+    scores = [sum(weight.get(term, 0.0) for term in words) for words in chunk_terms]
+    # Stable, so chunks that match equally keep their document order
+    return [chunk for _, chunk in sorted(zip(scores, chunks), key=lambda pair: -pair[0])]
+
+def stream_answer(question: str) -> Iterator[str]:
+    if not question:
+        return
+    
+    if not is_ready():
+        yield "The assistant is still loading. Please try again in a moment."
+        return
+    
+    documents = tamer.get_documents()
+    context = ""
+    if documents:
+        contents = [doc["content"] if isinstance(doc, dict) else doc.content for doc in documents]
+        budget = prompt_budget(chat_prompt.render(documents="", question=question))
+        # Only the first pack fits the prompt, so it is filled with the most relevant chunks
+        packed = pack_chunks(rank_chunks(question, contents), budget)
+        context = packed[0] if packed else ""
+    
+    yield from chat_prompt.stream(documents=context, question=question)
+
+def ask_question(question: str) -> str:
+    return "".join(stream_answer(question))
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict
+from config import (
+    SUMMARY_LATENCY_SLO_MS, QUIZ_LATENCY_SLO_MS, TASK_LATENCY_SLO_MS, BREAKER_MAX_ERROR_RATE,
+    BREAKER_WINDOW_SECONDS, BREAKER_MIN_SAMPLES, BREAKER_OPEN_SECONDS, BREAKER_MAX_QUEUE_DEPTH
+)
+
+_local = threading.local()
+
+def reset_degraded() -> None:
+    _local.degraded = False
+
+def was_degraded() -> bool:
+    return getattr(_local, "degraded", False)
+
+def degraded(result: Any) -> Any:
+    """Marks the current request as served by a fallback and returns ``result``."""
+    _local.degraded = True
+    return result
+
+def inference_queue_depth() -> int:
+    import sys
+    scheduler_module = sys.modules.get("backend.inference_scheduler")
+    # Queued bulk work yields to interactive requests, so only the latter counts
+    return scheduler_module.scheduler.queue_depth("interactive") if scheduler_module else 0
+
+class CircuitBreaker:
+    """Routes a feature to its rule-based fallback when the model path is too slow or failing.
+
+    The breaker opens when the rolling p95 latency exceeds the SLO or the error
+    rate exceeds BREAKER_MAX_ERROR_RATE, stays open for BREAKER_OPEN_SECONDS,
+    then lets a single probe through (half-open) to decide whether to close.
+    """
+
+    def __init__(self, name: str, slo_ms: float):
+        self.name = name
+        self.slo = slo_ms / 1000
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.samples = deque()
+        self.lock = threading.Lock()
+        self.stats = {"model": 0, "fallback": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        from backend.warmup import is_ready
+        with self.lock:
+            allowed = is_ready() and self._allow()
+            self.stats["model" if allowed else "fallback"] += 1
+            return allowed
+
+    def _allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < BREAKER_OPEN_SECONDS:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+        # Shed load without opening while the inference queue is backed up
+        return inference_queue_depth() <= BREAKER_MAX_QUEUE_DEPTH
+
+    @contextmanager
+    def track(self):
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self._record(time.monotonic() - started, False)
+            raise
+        except BaseException:
+            # Cancelled work says nothing about the model's health
+            with self.lock:
+                self.probing = False
+            raise
+        self._record(time.monotonic() - started, True)
+
+    def _record(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if self.state == "half_open":
+                self.probing = False
+                if ok and latency <= self.slo:
+                    self.state = "closed"
+                    self.samples.clear()
+                else:
+                    self._open(now)
+                return
+
+            self.samples.append((now, latency, ok))
+            while self.samples and now - self.samples[0][0] > BREAKER_WINDOW_SECONDS:
+                self.samples.popleft()
+            if self.state == "closed" and len(self.samples) >= BREAKER_MIN_SAMPLES:
+                p95, error_rate = self._window()
+                if p95 > self.slo or error_rate > BREAKER_MAX_ERROR_RATE:
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = "open"
+        self.opened_at = now
+        self.stats["opened"] += 1
+
+    def _window(self):
+        latencies = sorted(latency for _, latency, _ in self.samples)
+        errors = sum(1 for _, _, ok in self.samples if not ok)
+        return latencies[int(0.95 * (len(latencies) - 1))], errors / len(self.samples)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            p95, error_rate = self._window() if self.samples else (0.0, 0.0)
+            return dict(self.stats, state=self.state, p95_ms=round(1000 * p95, 1), error_rate=round(error_rate, 3))
+
+breakers = {
+    "summary": CircuitBreaker("summary", SUMMARY_LATENCY_SLO_MS),
+    "quiz": CircuitBreaker("quiz", QUIZ_LATENCY_SLO_MS),
+    "task": CircuitBreaker("task", TASK_LATENCY_SLO_MS),
+}
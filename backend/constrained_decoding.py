@@ -0,0 +1,265 @@
+import re
+from typing import Any, Dict, List, Optional
+from config import QUIZ_MAX_TOKENS_PER_QUESTION
+
+# flan-t5's SentencePiece vocabulary has no "{" or "}" pieces, so the model
+# cannot spell a JSON object. Quizzes are decoded in this bracket-free form
+# instead and converted to the question/options/answer dicts afterwards:
+#
+#   Question: ...? (A) ... (B) ... (C) ... (D) ... (Answer: B)
+QUIZ_FORMAT = "Question: ...? (A) ... (B) ... (C) ... (D) ... (Answer: letter)"
+OPTION_LETTERS = "ABCD"
+MAX_QUESTION_CHARS = 240
+MAX_OPTION_CHARS = 100
+TOP_K = 16
+# Characters that can open a free-text field
+FIELD_START_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+# Worst case for steering a question past its token cap to a close: one token
+# for every remaining non-space character of the shortest complete question
+CLOSING_TOKENS = len("Question:x?(A)x(B)x(C)x(D)x(Answer:A)")
+
+QUIZ_PATTERN = re.compile(
+    r"Question:\s*(?P<question>[^?()]+\?)\s*"
+    r"\(A\)\s*(?P<A>[^(]+?)\s*\(B\)\s*(?P<B>[^(]+?)\s*\(C\)\s*(?P<C>[^(]+?)\s*\(D\)\s*(?P<D>[^(]+?)\s*"
+    r"\(Answer:\s*(?P<answer>[ABCD])\)"
+)
+
+def parse_quiz_text(text: str) -> List[Dict[str, Any]]:
+    """Converts quiz text in QUIZ_FORMAT into question dicts, skipping incomplete ones."""
+    questions = []
+    for match in QUIZ_PATTERN.finditer(text):
+        options = [match.group(letter).strip() for letter in OPTION_LETTERS]
+        if not all(options):
+            continue
+        questions.append({
+            "question": match.group("question").strip(),
+            "options": options,
+            "answer": options[OPTION_LETTERS.index(match.group("answer"))]
+        })
+    return questions
+
+def question_token_budget(limit: int = QUIZ_MAX_TOKENS_PER_QUESTION) -> int:
+    """max_new_tokens to allow per question: the soft cap plus the forced close."""
+    return limit + CLOSING_TOKENS
+
+class QuizSchemaMachine:
+    """Character-level state machine accepting prefixes of QUIZ_FORMAT text.
+
+    Literal parts of the format are matched exactly; free-text fields end at
+    their terminator character ("?" for the question, "(" for options) and are
+    length capped so a runaway field is forced to close. ``steps`` counts the
+    tokens spent on the current question.
+    """
+
+    __slots__ = ("state", "literal", "position", "after", "field", "chars", "questions", "steps")
+    item_token_limit = QUIZ_MAX_TOKENS_PER_QUESTION
+
+    def __init__(self):
+        self.questions = 0
+        self.steps = 0
+        self._expect("Question:", "question")
+
+    def copy(self) -> "QuizSchemaMachine":
+        machine = QuizSchemaMachine.__new__(QuizSchemaMachine)
+        for name in self.__slots__:
+            setattr(machine, name, getattr(self, name))
+        return machine
+
+    def _expect(self, literal: str, after: str, field: int = 0) -> None:
+        self.state, self.literal, self.position, self.after = "literal", literal, 0, after
+        self.field, self.chars = field, 0
+
+    def _enter(self, state: str) -> None:
+        if state == "done":
+            self.questions += 1
+        self.state, self.chars = state, 0
+
+    def feed(self, text: str) -> bool:
+        """Advances over ``text``; returns False if it leaves the format."""
+        for char in text:
+            if not self._feed_char(char):
+                return False
+        return True
+
+    def feed_token(self, text: str) -> bool:
+        questions = self.questions
+        if not self.feed(text):
+            return False
+        self.steps = 0 if self.questions > questions else self.steps + 1
+        return True
+
+    @property
+    def items(self) -> int:
+        return self.questions
+
+    def _feed_char(self, char: str) -> bool:
+        state = self.state
+        if state == "literal":
+            if char.isspace():
+                return self.position == 0
+            if char != self.literal[self.position]:
+                return False
+            self.position += 1
+            if self.position == len(self.literal):
+                self._enter(self.after)
+            return True
+
+        if state == "question":
+            if char == "?" and self.chars:
+                self._expect("(A)", "option", 0)
+                return True
+            if char in "()?":
+                return False
+            return self._field_char(char, MAX_QUESTION_CHARS)
+
+        if state == "option":
+            if char == "(" and self.chars:
+                if self.field < len(OPTION_LETTERS) - 1:
+                    self._expect(OPTION_LETTERS[self.field + 1] + ")", "option", self.field + 1)
+                else:
+                    self._expect("Answer:", "answer")
+                return True
+            if char == "(":
+                return False
+            return self._field_char(char, MAX_OPTION_CHARS)
+
+        if state == "answer":
+            if char.isspace():
+                return True
+            if char not in OPTION_LETTERS:
+                return False
+            self._expect(")", "done")
+            return True
+
+        # "done": only whitespace or the start of the next question
+        if char.isspace():
+            return True
+        if char == "Q":
+            self._expect("uestion:", "question")
+            return True
+        return False
+
+    def _field_char(self, char: str, limit: int) -> bool:
+        if char.isspace():
+            return True
+        self.chars += 1
+        return self.chars <= limit
+
+    def can_end(self) -> bool:
+        return self.state == "done"
+
+    def next_chars(self) -> str:
+        """Characters that always keep the text in the format, used when no likely token does."""
+        if self.state == "literal":
+            return self.literal[self.position]
+        if self.state in ("question", "option") and not self.chars:
+            # An empty field cannot close yet
+            return FIELD_START_CHARS
+        return {"question": "?", "option": "(", "answer": OPTION_LETTERS, "done": "Q"}[self.state]
+
+SCHEMAS = {"quiz": QuizSchemaMachine}
+
+_vocabularies: Dict[int, Any] = {}
+
+def _vocabulary(tokenizer) -> Any:
+    """Token pieces as decoded text plus an index of token ids by first character."""
+    key = id(tokenizer)
+    if key not in _vocabularies:
+        special = set(tokenizer.all_special_ids)
+        pieces: List[Optional[str]] = []
+        by_first_char: Dict[str, List[int]] = {}
+        for token_id, piece in enumerate(tokenizer.convert_ids_to_tokens(list(range(len(tokenizer))))):
+            if token_id in special or piece is None:
+                pieces.append(None)
+                continue
+            text = piece.replace("▁", " ")
+            pieces.append(text)
+            stripped = text.lstrip()
+            if stripped:
+                by_first_char.setdefault(stripped[0], []).append(token_id)
+        _vocabularies[key] = (pieces, by_first_char)
+    return _vocabularies[key]
+
+class SchemaLogitsProcessor:
+    """Masks every token that would take a generation outside the schema's format.
+
+    Only the ``TOP_K`` most likely tokens are checked against the state
+    machine each step; if none of them fit, the best token starting with a
+    character the machine requires is forced instead. Once a row has
+    ``max_items`` complete items it is ended, and an item that runs past the
+    machine's ``item_token_limit`` is steered along its shortest completion:
+    each remaining field gets one token and is closed, so a capped question
+    still parses.
+    """
+
+    def __init__(self, schema: str, tokenizer, max_items: int = None):
+        self.machine_class = SCHEMAS[schema]
+        self.max_items = max_items
+        self.eos_token_id = tokenizer.eos_token_id
+        self.pad_token_id = tokenizer.pad_token_id
+        self.pieces, self.by_first_char = _vocabulary(tokenizer)
+        self.states: Dict[tuple, QuizSchemaMachine] = {}
+
+    def _machine(self, tokens: List[int]) -> Optional[QuizSchemaMachine]:
+        key = tuple(tokens)
+        previous = self.states.get(key[:-1]) if key else None
+        if previous is not None:
+            machine = previous.copy()
+            piece = self.pieces[key[-1]]
+            if piece is None or not machine.feed_token(piece):
+                return None
+        else:
+            machine = self.machine_class()
+            for token in tokens:
+                piece = self.pieces[token]
+                if piece is None or not machine.feed_token(piece):
+                    return None
+        return machine
+
+    def _accepts(self, machine: QuizSchemaMachine, token: int) -> bool:
+        if token == self.eos_token_id:
+            return machine.can_end()
+        piece = self.pieces[token] if token < len(self.pieces) else None
+        return piece is not None and machine.copy().feed(piece)
+
+    def _allowed(self, machine: QuizSchemaMachine, scores) -> List[int]:
+        import torch
+
+        if self.max_items and machine.items >= self.max_items:
+            return [self.eos_token_id]
+        allowed = []
+        if machine.steps < machine.item_token_limit:
+            top = torch.topk(scores, min(TOP_K, scores.shape[-1])).indices.tolist()
+            allowed = [token for token in top if self._accepts(machine, token)]
+        if not allowed:
+            candidates = [
+                token for char in machine.next_chars()
+                for token in self.by_first_char.get(char, [])
+                if token < scores.shape[-1]
+            ]
+            if candidates:
+                ranked = torch.tensor(candidates)[torch.argsort(scores[candidates], descending=True)].tolist()
+                # Candidates are checked best first, since an empty field admits most of the vocabulary
+                token = next((token for token in ranked if self._accepts(machine, token)), None)
+                allowed = [token] if token is not None else []
+        if machine.can_end() and self.eos_token_id not in allowed:
+            allowed.append(self.eos_token_id)
+        return allowed or [self.eos_token_id]
+
+    def __call__(self, input_ids, scores):
+        states = {}
+        for row in range(input_ids.shape[0]):
+            # Skip the decoder start token
+            tokens = input_ids[row, 1:].tolist()
+            if self.eos_token_id in tokens or (tokens and tokens[-1] == self.pad_token_id):
+                continue  # finished rows only receive padding
+            machine = self._machine(tokens)
+            if machine is None:
+                continue
+            states[tuple(tokens)] = machine
+            allowed = self._allowed(machine, scores[row])
+            mask = scores.new_full(scores[row].shape, float("-inf"))
+            mask[allowed] = 0
+            scores[row] = scores[row] + mask
+        self.states = states
+        return scores
@@ -1,5 +1,10 @@
+import hashlib
 from typing import List, Dict, Any, Union
 from utils.fallback_detector import HAYSTACK_AVAILABLE
+from utils.process_pool import run_cpu_bound
+from utils.single_flight import single_flight
+from utils.cancellation import check_cancelled
+from config import DOCUMENT_SPLIT_LENGTH, DOCUMENT_SPLIT_OVERLAP
 
 class TaskTamerFallback:
     def __init__(self):
@@ -33,23 +38,34 @@ if HAYSTACK_AVAILABLE:
         from haystack.document_stores import InMemoryDocumentStore
         from haystack.nodes import PreProcessor
         
-        class TaskTamer:
-            def __init__(self):
-                self.document_store = InMemoryDocumentStore()
-                self.preprocessor = PreProcessor(
+        _preprocessor = None
+        
+        def split_text(text: str) -> List[Any]:
+            global _preprocessor
+            if _preprocessor is None:
+                _preprocessor = PreProcessor(
                     clean_empty_lines=True,
                     clean_whitespace=True,
                     split_by='word',
-                    split_length=200,
-                    split_overlap=50,
-                    split_respect_sentence_boundary=True
+                    split_length=DOCUMENT_SPLIT_LENGTH,
+                    split_overlap=DOCUMENT_SPLIT_OVERLAP,
+                    split_respect_sentence_boundary=True,
+                    progress_bar=False
                 )
+            return _preprocessor.process([{"content": text}])
+        
+        class TaskTamer:
+            def __init__(self):
+                self.document_store = InMemoryDocumentStore()
                 
             def process_text(self, text: str) -> List[Dict[str, Any]]:
                 if not text:
                     return []
                 
-                processed_docs = self.preprocessor.process([{"content": text}])
+                check_cancelled("chunking")
+                key = ("split", hashlib.sha256(text.encode("utf-8")).hexdigest())
+                processed_docs = single_flight.do(key, run_cpu_bound, split_text, text)
+                check_cancelled("chunking")
                 self.document_store.write_documents(processed_docs)
                 return processed_docs
             
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterator, List, Tuple
+from config import DOCUMENT_SPLIT_LENGTH, SUMMARY_CHUNK_CACHE_SIZE
+
+BOUNDARY_MASK = 0x3
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def content_defined_chunks(text: str, target_words: int = DOCUMENT_SPLIT_LENGTH, budget: int = None) -> List[str]:
+    """Groups paragraphs into chunks whose boundaries depend on paragraph content.
+
+    A chunk ends after a paragraph whose hash matches BOUNDARY_MASK once it has
+    at least half the target length, or unconditionally at twice the target.
+    An edit therefore only moves the boundaries around the edited paragraph,
+    so the hashes of the other chunks stay the same between fetches. With a
+    ``budget``, chunks longer than that many tokens are split by sentence so
+    the model reads all of them.
+    """
+    chunks = []
+    current = []
+    words = 0
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        current.append(paragraph)
+        words += len(paragraph.split())
+        at_boundary = int(_hash(paragraph)[:8], 16) & BOUNDARY_MASK == 0
+        if words >= 2 * target_words or (words >= target_words // 2 and at_boundary):
+            chunks.append("\n".join(current))
+            current = []
+            words = 0
+    if current:
+        chunks.append("\n".join(current))
+    if budget:
+        from backend.token_packing import fit_chunks
+        chunks = fit_chunks(chunks, budget)
+    return chunks
+
+class DeltaSummaryCache:
+    """Keeps per-URL chunk hash lists, per-chunk summaries and the last combined result.
+
+    A chunk summary is dropped once no URL's latest version contains the
+    chunk any more; chunks shared by several pages stay until all of them
+    have moved on, and the LRU bounds the rest.
+    """
+
+    def __init__(self, max_chunks: int = SUMMARY_CHUNK_CACHE_SIZE):
+        self.max_chunks = max_chunks
+        self.url_chunks: Dict[str, List[str]] = {}
+        self.chunk_refs: Counter = Counter()
+        self.chunk_summaries: "OrderedDict[str, str]" = OrderedDict()
+        self.url_results: Dict[str, Tuple[str, str]] = {}
+        self.lock = threading.Lock()
+        self.last_run = {"chunks": 0, "summarized": 0}
+
+    def _get(self, chunk_hash: str):
+        with self.lock:
+            summary = self.chunk_summaries.get(chunk_hash)
+            if summary is not None:
+                self.chunk_summaries.move_to_end(chunk_hash)
+            return summary
+
+    def _put(self, chunk_hash: str, summary: str) -> None:
+        with self.lock:
+            self.chunk_summaries[chunk_hash] = summary
+            self.chunk_summaries.move_to_end(chunk_hash)
+            while len(self.chunk_summaries) > self.max_chunks:
+                self.chunk_summaries.popitem(last=False)
+
+    def _chunk_summaries(self, url: str, text: str, summarize_chunks: Callable[[List[str]], List[str]],
+                         budget: int = None):
+        """Summarizes the chunks not seen before; returns what the reduce step needs."""
+        chunks = content_defined_chunks(text, budget=budget)
+        hashes = [_hash(chunk) for chunk in chunks]
+        summaries = [self._get(chunk_hash) for chunk_hash in hashes]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+
+        if missing:
+            for i, summary in zip(missing, summarize_chunks([chunks[i] for i in missing])):
+                self._put(hashes[i], summary)
+                summaries[i] = summary
+
+        result_key = _hash("".join(hashes))
+        with self.lock:
+            result = self.url_results.get(url)
+            self.last_run = {"chunks": len(chunks), "summarized": len(missing)}
+        cached = result[1] if result is not None and result[0] == result_key else None
+        return hashes, [s for s in summaries if s.strip()], result_key, cached
+
+    def _store(self, url: str, hashes: List[str], result_key: str, result: str) -> None:
+        with self.lock:
+            previous = set(self.url_chunks.get(url, []))
+            self.chunk_refs.update(set(hashes) - previous)
+            for stale in previous - set(hashes):
+                self.chunk_refs[stale] -= 1
+                if self.chunk_refs[stale] <= 0:
+                    del self.chunk_refs[stale]
+                    self.chunk_summaries.pop(stale, None)
+            self.url_chunks[url] = hashes
+            self.url_results[url] = (result_key, result)
+
+    def summarize(self, url: str, text: str, summarize_chunks: Callable[[List[str]], List[str]],
+                  reduce_summaries: Callable[[List[str]], str], budget: int = None) -> str:
+        """Summarizes ``text`` chunked to at most ``budget`` tokens, reusing unchanged chunks."""
+        hashes, summaries, result_key, result = self._chunk_summaries(url, text, summarize_chunks, budget)
+        if result is None:
+            result = reduce_summaries(summaries)
+        self._store(url, hashes, result_key, result)
+        return result
+
+    def stream(self, url: str, text: str, summarize_chunks: Callable[[List[str]], List[str]],
+               stream_reduce: Callable[[List[str]], Iterator[str]], budget: int = None) -> Iterator[str]:
+        """Like summarize, but yields the final reduce pass as it is generated."""
+        hashes, summaries, result_key, result = self._chunk_summaries(url, text, summarize_chunks, budget)
+        if result is not None:
+            yield result
+        else:
+            pieces = []
+            for piece in stream_reduce(summaries):
+                pieces.append(piece)
+                yield piece
+            result = "".join(pieces)
+        self._store(url, hashes, result_key, result)
+
+delta_cache = DeltaSummaryCache()
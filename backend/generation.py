@@ -0,0 +1,146 @@
+import threading
+from typing import Any, Iterator, List
+from config import LLM_MODEL, MODEL_CONTEXT_TOKENS, GENERATION_BATCH_SIZE, GENERATION_TOKEN_BUDGET
+from backend.model_registry import get_pipeline, get_tokenizer
+
+def count_tokens(text: str, model_name: str = LLM_MODEL) -> int:
+    return len(get_tokenizer(model_name)(text, add_special_tokens=True)["input_ids"])
+
+def fits_context(text: str, reserve: int = 0, model_name: str = LLM_MODEL) -> bool:
+    return count_tokens(text, model_name) <= MODEL_CONTEXT_TOKENS - reserve
+
+def plan_batches(lengths: List[int], max_batch_size: int, token_budget: int = None) -> List[List[int]]:
+    """Groups input indices into batches of similar token length.
+
+    Indices are sorted by length so each batch pads only to its own longest
+    input, and a batch is closed once its padded size would exceed
+    ``token_budget`` tokens or it holds ``max_batch_size`` inputs. Without a
+    budget the inputs keep their order in fixed-size batches.
+    """
+    indices = list(range(len(lengths)))
+    if not token_budget:
+        return [indices[start:start + max_batch_size] for start in range(0, len(indices), max_batch_size)]
+
+    batches, batch, longest = [], [], 0
+    for i in sorted(indices, key=lambda i: lengths[i]):
+        padded = (len(batch) + 1) * max(longest, lengths[i])
+        if batch and (len(batch) >= max_batch_size or padded > token_budget):
+            batches.append(batch)
+            batch, longest = [], 0
+        batch.append(i)
+        longest = max(longest, lengths[i])
+    if batch:
+        batches.append(batch)
+    return batches
+
+def generate(prompts: List[str], model_name: str = LLM_MODEL, batch_size: int = GENERATION_BATCH_SIZE,
+             max_new_tokens: int = 128, token_budget: int = GENERATION_TOKEN_BUDGET,
+             schema: str = None, max_items: int = None, cancel_tokens: List[Any] = None,
+             **generate_kwargs) -> List[str]:
+    """Runs prompts through the shared model in length-bucketed batches.
+
+    With inference workers enabled the call is forwarded to the worker process.
+
+    Batches hold at most ``batch_size`` prompts and ``token_budget`` padded
+    input tokens; outputs come back in the order of ``prompts``. ``schema``
+    names a format from ``backend.constrained_decoding.SCHEMAS`` that every
+    output is constrained to; decoding ends once ``max_items`` items are complete.
+    Generation stops early once every prompt's cancel token is cancelled;
+    without ``cancel_tokens`` the calling thread's token applies to all of them.
+    """
+    from backend.inference_workers import supervisor, use_workers
+    if use_workers():
+        return supervisor.generate(
+            prompts, model_name=model_name, batch_size=batch_size, max_new_tokens=max_new_tokens,
+            token_budget=token_budget, schema=schema, max_items=max_items,
+            cancel_tokens=cancel_tokens, **generate_kwargs
+        )
+
+    import torch
+    from transformers import StoppingCriteriaList
+    from utils.cancellation import CancelledCriteria, current_token
+
+    pipe = get_pipeline(model_name)
+    tokenizer, model = pipe.tokenizer, pipe.model
+    encoded = tokenizer(prompts, truncation=True, max_length=MODEL_CONTEXT_TOKENS)["input_ids"]
+    cancel_tokens = cancel_tokens or [current_token()] * len(prompts)
+    outputs: List[str] = [""] * len(prompts)
+    for indices in plan_batches([len(ids) for ids in encoded], batch_size, token_budget):
+        tokens = [cancel_tokens[i] for i in indices]
+        if all(token is not None and token.cancelled for token in tokens):
+            continue
+        with torch.inference_mode():
+            inputs = tokenizer.pad(
+                {"input_ids": [encoded[i] for i in indices]},
+                return_tensors="pt"
+            ).to(model.device)
+            if schema:
+                from transformers import LogitsProcessorList
+                from backend.constrained_decoding import SchemaLogitsProcessor
+                inputs["logits_processor"] = LogitsProcessorList([SchemaLogitsProcessor(schema, tokenizer, max_items)])
+            if any(token is not None for token in tokens):
+                inputs["stopping_criteria"] = StoppingCriteriaList([CancelledCriteria(tokens)])
+            output_ids = model.generate(**inputs, max_new_tokens=max_new_tokens, **generate_kwargs)
+        for i, text in zip(indices, tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+            outputs[i] = text
+    return outputs
+
+def stream(prompt: str, model_name: str = LLM_MODEL, max_new_tokens: int = 128, **generate_kwargs) -> Iterator[str]:
+    """Yields decoded text as the model generates it for a single prompt.
+
+    Generation stops when the calling thread's cancel token fires or when the
+    consumer stops iterating, e.g. because Streamlit interrupted the script.
+    """
+    from backend.inference_workers import supervisor, use_workers
+    if use_workers():
+        yield from supervisor.stream(
+            prompt, model_name=model_name, max_new_tokens=max_new_tokens, **generate_kwargs
+        )
+        return
+
+    import torch
+    from transformers import StoppingCriteriaList, TextIteratorStreamer
+    from utils.cancellation import CancelToken, CancelledCriteria, check_cancelled, current_token, record_abandoned
+
+    pipe = get_pipeline(model_name)
+    tokenizer, model = pipe.tokenizer, pipe.model
+    inputs = tokenizer(
+        [prompt],
+        return_tensors="pt",
+        truncation=True,
+        max_length=MODEL_CONTEXT_TOKENS
+    ).to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    token = current_token()
+    abandoned = CancelToken()
+    stopping_criteria = StoppingCriteriaList([
+        CancelledCriteria([abandoned]),
+        CancelledCriteria([token])
+    ])
+    errors = []
+
+    def run():
+        try:
+            with torch.inference_mode():
+                model.generate(**inputs, max_new_tokens=max_new_tokens, streamer=streamer,
+                               stopping_criteria=stopping_criteria, **generate_kwargs)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    finished = False
+    try:
+        for text in streamer:
+            if text:
+                yield text
+        finished = True
+    finally:
+        if not finished:
+            abandoned.cancel()
+            record_abandoned("stream")
+    thread.join()
+    if errors:
+        raise errors[0]
+    check_cancelled("stream", token)
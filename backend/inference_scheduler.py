@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from utils.cancellation import Cancelled, current_token, record_abandoned
+from config import (
+    LLM_MODEL, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS, INFERENCE_PRIORITY_MODE,
+    INFERENCE_PRIORITY_WEIGHTS, INFERENCE_CLASS_LIMITS
+)
+
+PRIORITIES = ("interactive", "bulk")
+
+_local = threading.local()
+
+def current_priority() -> str:
+    return getattr(_local, "priority", "interactive")
+
+@contextmanager
+def inference_priority(priority: str) -> Iterator[None]:
+    """Runs scheduler submissions made by this thread in the given priority class."""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+class InferenceRequest:
+    def __init__(self, prompt: str, model_name: str, params: Dict[str, Any], priority: str,
+                 max_batch_size: int = None):
+        self.prompt = prompt
+        self.model_name = model_name
+        self.params = params
+        self.priority = priority
+        self.max_batch_size = max_batch_size
+        # The submitting thread's cancel token travels with the request
+        self.token = current_token()
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+    @property
+    def batch_key(self) -> Tuple:
+        # Only requests with the same model and generation settings can share a batch
+        return (self.model_name, tuple(sorted(self.params.items())))
+
+class InferenceScheduler:
+    """Collects prompts from all sessions into micro-batches for one generate call.
+
+    A batch is closed when it reaches ``max_batch_size`` requests or when the
+    oldest request has waited ``max_wait_ms``, whichever comes first.
+
+    Requests belong to a priority class and every batch is drawn from one
+    class. In "strict" mode interactive requests always go first; in
+    "weighted" mode classes share batches in proportion to their weights. A
+    bulk batch still being collected is put back at the head of its queue when
+    interactive work arrives that would be picked next, and each class can be capped to a number of
+    outstanding requests, beyond which submitters wait.
+
+    A request's ``max_batch_size`` caps the generate batches it runs in, e.g.
+    SUMMARY_BATCH_SIZE for summaries; collection is not affected.
+    """
+
+    def __init__(self, max_batch_size: int = INFERENCE_MAX_BATCH_SIZE, max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+                 mode: str = INFERENCE_PRIORITY_MODE, weights: Dict[str, int] = None,
+                 limits: Dict[str, int] = None):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.mode = mode
+        self.weights = weights or INFERENCE_PRIORITY_WEIGHTS
+        self.queues: Dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self.condition = threading.Condition()
+        self.slots = {
+            priority: threading.BoundedSemaphore(limit)
+            for priority, limit in (limits or INFERENCE_CLASS_LIMITS).items() if limit
+        }
+        self.served = {priority: 0 for priority in PRIORITIES}
+        self.worker = None
+        self.worker_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.batches = 0
+        self.completed = 0
+        self.preempted = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = deque(maxlen=1000)
+        self.wait_times = {priority: deque(maxlen=1000) for priority in PRIORITIES}
+
+    def submit(self, prompt: str, model_name: str = LLM_MODEL, priority: str = None, max_batch_size: int = None,
+               **params) -> Future:
+        self._ensure_worker()
+        priority = priority or current_priority()
+        slot = self.slots.get(priority)
+        if slot is not None:
+            slot.acquire()
+        request = InferenceRequest(prompt, model_name, params, priority, max_batch_size)
+        if slot is not None:
+            request.future.add_done_callback(lambda _: slot.release())
+        with self.condition:
+            if not self.queues[priority]:
+                self._catch_up(priority)
+            self.queues[priority].append(request)
+            self.condition.notify()
+        with self.stats_lock:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+        return request.future
+
+    def submit_many(self, prompts: List[str], model_name: str = LLM_MODEL, priority: str = None,
+                    max_batch_size: int = None, **params) -> List[Future]:
+        return [self.submit(prompt, model_name, priority, max_batch_size, **params) for prompt in prompts]
+
+    def queue_depth(self, priority: str = None) -> int:
+        if priority:
+            return len(self.queues[priority])
+        return sum(len(requests) for requests in self.queues.values())
+
+    def _ensure_worker(self) -> None:
+        if self.worker is None or not self.worker.is_alive():
+            with self.worker_lock:
+                if self.worker is None or not self.worker.is_alive():
+                    self.worker = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+                    self.worker.start()
+
+    def _share(self, priority: str) -> float:
+        return self.served[priority] / self.weights.get(priority, 1)
+
+    def _catch_up(self, priority: str) -> None:
+        # A class returning from idle starts level with the busy classes
+        # rather than claiming every batch it missed while away
+        active = [self._share(other) for other in PRIORITIES if other != priority and self.queues[other]]
+        if active:
+            self.served[priority] = max(self.served[priority], min(active) * self.weights.get(priority, 1))
+
+    def _next_class(self) -> str:
+        waiting = [priority for priority in PRIORITIES if self.queues[priority]]
+        if not waiting:
+            return None
+        if self.mode == "weighted":
+            return min(waiting, key=self._share)
+        return waiting[0]
+
+    def _preempts(self, priority: str) -> bool:
+        if priority == "interactive" or not self.queues["interactive"]:
+            return False
+        if self.mode == "weighted":
+            # Only when the weighted pick, counting the batch being collected,
+            # would switch to interactive; otherwise the same batch is picked again
+            return self._share("interactive") <= self._share(priority)
+        return True
+
+    def _collect(self) -> List[InferenceRequest]:
+        with self.condition:
+            while self._next_class() is None:
+                self.condition.wait()
+            priority = self._next_class()
+            queue = self.queues[priority]
+            batch = [queue.popleft()]
+            deadline = batch[0].enqueued_at + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if self._preempts(priority):
+                    # Interactive work arrived while a bulk batch was forming
+                    queue.extendleft(reversed(batch))
+                    with self.stats_lock:
+                        self.preempted += len(batch)
+                    return []
+                if queue:
+                    batch.append(queue.popleft())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            self.served[priority] += len(batch)
+            return batch
+
+    def _run(self) -> None:
+        from backend.generation import generate
+
+        while True:
+            groups: Dict[Tuple, List[InferenceRequest]] = {}
+            for request in self._collect():
+                groups.setdefault(request.batch_key, []).append(request)
+
+            for group in groups.values():
+                # Requests cancelled while queued are dropped before they cost anything
+                group = [request for request in group if not self._abandon(request, "queued")]
+                if not group:
+                    continue
+                started = time.perf_counter()
+                caps = [request.max_batch_size for request in group if request.max_batch_size]
+                try:
+                    outputs = generate(
+                        [request.prompt for request in group],
+                        model_name=group[0].model_name,
+                        batch_size=min([len(group)] + caps),
+                        cancel_tokens=[request.token for request in group],
+                        **group[0].params
+                    )
+                except Exception as e:
+                    for request in group:
+                        request.future.set_exception(e)
+                else:
+                    for request, output in zip(group, outputs):
+                        if not self._abandon(request, "generation"):
+                            request.future.set_result(output)
+                self._record(group, started)
+
+    @staticmethod
+    def _abandon(request: InferenceRequest, stage: str) -> bool:
+        if request.token is None or not request.token.cancelled:
+            return False
+        record_abandoned(stage)
+        request.future.set_exception(Cancelled(stage))
+        return True
+
+    def _record(self, group: List[InferenceRequest], started: float) -> None:
+        with self.stats_lock:
+            self.batches += 1
+            self.completed += len(group)
+            self.batch_sizes.append(len(group))
+            self.wait_times[group[0].priority].extend(started - request.enqueued_at for request in group)
+
+    def metrics(self) -> Dict[str, float]:
+        with self.stats_lock:
+            sizes = list(self.batch_sizes)
+            metrics = {
+                "batches": self.batches,
+                "requests": self.completed,
+                "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "queue_depth": self.queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "preempted": self.preempted
+            }
+            for priority in PRIORITIES:
+                waits = sorted(self.wait_times[priority])
+                metrics[f"{priority}_queue_depth"] = self.queue_depth(priority)
+                metrics[f"{priority}_avg_wait_ms"] = round(1000 * sum(waits) / len(waits), 2) if waits else 0.0
+                metrics[f"{priority}_p95_wait_ms"] = (
+                    round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0
+                )
+            return metrics
+
+scheduler = InferenceScheduler()
@@ -0,0 +1,147 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    INFERENCE_SERVER_URL, INFERENCE_SERVER_MODEL, INFERENCE_SERVER_TIMEOUT, INFERENCE_SERVER_RETRIES,
+    INFERENCE_SERVER_MAX_CONCURRENCY, INFERENCE_SERVER_TARGET_LATENCY_MS
+)
+
+def overloaded_status(status_code: int) -> bool:
+    """429 and every 5xx are retried and shrink the concurrency limit."""
+    return status_code == 429 or status_code >= 500
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by one per window of fast successes and halves on overload."""
+
+    def __init__(self, max_limit: int = INFERENCE_SERVER_MAX_CONCURRENCY,
+                 target_latency_ms: float = INFERENCE_SERVER_TARGET_LATENCY_MS):
+        self.max_limit = max_limit
+        self.target_latency = target_latency_ms / 1000
+        self.limit = float(max(1, max_limit // 4))
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded or latency > self.target_latency:
+                # Decrease at most once per target latency so one burst of
+                # slow responses does not collapse the limit to 1.
+                if now - self.last_decrease > self.target_latency:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.last_decrease = now
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+class InferenceServerClient:
+    """Client for a local OpenAI-compatible completions server (llama.cpp, vLLM)."""
+
+    def __init__(self, base_url: str = INFERENCE_SERVER_URL, model: str = INFERENCE_SERVER_MODEL):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=INFERENCE_SERVER_MAX_CONCURRENCY)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.limiter = AdaptiveLimiter()
+        self.executor = ThreadPoolExecutor(max_workers=INFERENCE_SERVER_MAX_CONCURRENCY,
+                                           thread_name_prefix="inference-server")
+
+    def _payload(self, prompt: str, params: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "max_tokens": params.get("max_new_tokens", 128),
+            "temperature": params.get("temperature", 0.0),
+            "stream": stream
+        }
+
+    def _post(self, payload: Dict[str, Any], stream: bool = False) -> Tuple[requests.Response, float]:
+        """Returns the response and its latency to headers.
+
+        A streamed response keeps its limiter slot; the caller releases it
+        once the stream is read.
+        """
+        for attempt in range(INFERENCE_SERVER_RETRIES + 1):
+            self.limiter.acquire()
+            started = time.perf_counter()
+            overloaded = True
+            held = False
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/v1/completions",
+                    json=payload,
+                    timeout=INFERENCE_SERVER_TIMEOUT,
+                    stream=stream
+                )
+                overloaded = overloaded_status(response.status_code)
+                if not overloaded:
+                    response.raise_for_status()
+                    held = stream
+                    return response, time.perf_counter() - started
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == INFERENCE_SERVER_RETRIES:
+                    raise
+                retry_after = None
+            finally:
+                if not held:
+                    self.limiter.release(time.perf_counter() - started, overloaded)
+
+            if attempt == INFERENCE_SERVER_RETRIES:
+                response.raise_for_status()
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 0.5 * 2 ** attempt
+            time.sleep(delay + random.uniform(0, 0.25))
+        raise RuntimeError("Inference server request failed")
+
+    def complete(self, prompt: str, **params) -> str:
+        response, _ = self._post(self._payload(prompt, params))
+        return response.json()["choices"][0]["text"].strip()
+
+    def complete_many(self, prompts: List[str], **params) -> List[str]:
+        """Fans prompts out concurrently; the adaptive limiter bounds requests in flight."""
+        futures = [self.executor.submit(self.complete, prompt, **params) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def stream(self, prompt: str, **params) -> Iterator[str]:
+        response, latency = self._post(self._payload(prompt, params, stream=True), stream=True)
+        try:
+            with response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    text = json.loads(data)["choices"][0].get("text", "")
+                    if text:
+                        yield text
+        finally:
+            # The server is busy with the stream until it ends; the limit adapts to time to first token
+            self.limiter.release(latency, False)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> InferenceServerClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceServerClient()
+    return _client
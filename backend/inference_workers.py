@@ -0,0 +1,386 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+from utils.cancellation import Cancelled, check_cancelled, current_token, record_abandoned
+from config import (
+    LLM_MODEL, INFERENCE_WORKERS_ENABLED, INFERENCE_WORKER_MAX_REQUESTS, INFERENCE_WORKER_MAX_RSS_MB,
+    INFERENCE_WORKER_START_TIMEOUT, INFERENCE_WORKER_REQUEST_TIMEOUT
+)
+
+POLL_SECONDS = 0.1
+STANDBY_RETRY_SECONDS = 60
+
+_in_worker = False
+
+def use_workers() -> bool:
+    """True in the app process when generation should be sent to a worker process."""
+    return INFERENCE_WORKERS_ENABLED and not _in_worker
+
+def rss_mb() -> float:
+    """Current resident set size of this process, or 0 where it cannot be measured.
+
+    Returning 0 leaves recycling by RSS off on such platforms; recycling by
+    request count still applies.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    # Peak rather than current RSS; reported in bytes on macOS and kilobytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+def _worker_main(conn, model_names: List[str]) -> None:
+    """Entry point of a worker process: warms its models, then serves requests until drained."""
+    global _in_worker
+    _in_worker = True
+
+    from backend.generation import generate, stream
+    from backend.warmup import warm_model
+    from utils.cancellation import CancelToken, cancellation_scope
+
+    send_lock = threading.Lock()
+    tokens: Dict[int, CancelToken] = {}
+    threads: Dict[int, threading.Thread] = {}
+
+    def send(message: tuple) -> None:
+        with send_lock:
+            conn.send(message)
+
+    def serve(kind: str, request_id: int, payload: tuple) -> None:
+        try:
+            with cancellation_scope(tokens[request_id]):
+                if kind == "generate":
+                    prompts, model_name, kwargs = payload
+                    send(("result", request_id, generate(prompts, model_name=model_name, **kwargs), rss_mb()))
+                else:
+                    prompt, model_name, kwargs = payload
+                    for text in stream(prompt, model_name=model_name, **kwargs):
+                        send(("chunk", request_id, text))
+                    send(("end", request_id, rss_mb()))
+        except Cancelled:
+            send(("error", request_id, "cancelled", True, rss_mb()))
+        except Exception as e:
+            send(("error", request_id, f"{type(e).__name__}: {e}", False, rss_mb()))
+        finally:
+            tokens.pop(request_id, None)
+
+    for model_name in model_names:
+        warm_model(model_name)
+    send(("ready", rss_mb()))
+
+    draining = False
+    while not draining or any(thread.is_alive() for thread in threads.values()):
+        if not conn.poll(POLL_SECONDS):
+            continue
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        kind = message[0]
+        if kind == "drain":
+            draining = True
+        elif draining and kind in ("generate", "stream"):
+            # Routed here just before the supervisor switched workers
+            send(("retry", message[1]))
+        elif kind == "cancel":
+            token = tokens.get(message[1])
+            if token is not None:
+                token.cancel()
+        else:
+            request_id = message[1]
+            tokens[request_id] = CancelToken()
+            threads[request_id] = threading.Thread(
+                target=serve, args=(kind, request_id, message[2:]), name=f"inference-{request_id}", daemon=True
+            )
+            threads[request_id].start()
+        threads = {request_id: thread for request_id, thread in threads.items() if thread.is_alive()}
+    conn.close()
+
+class WorkerHandle:
+    """The app side of one worker process and the pipe to it."""
+
+    def __init__(self, model_names: List[str]):
+        context = mp.get_context("spawn")
+        self.conn, child_conn = context.Pipe(duplex=True)
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, model_names), name="inference-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.send_lock = threading.Lock()
+        self.pending: Dict[int, "queue.Queue[tuple]"] = {}
+        self.pending_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.closed = False
+        self.draining = False
+        self.failure: Optional[str] = None
+        self.served = 0
+        self.rss_mb = 0.0
+        self.models: Set[str] = set(model_names)
+        self.started = time.monotonic()
+        self.reader = threading.Thread(target=self._read, name="inference-worker-reader", daemon=True)
+        self.reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.process.is_alive()
+
+    def _read(self) -> None:
+        try:
+            while True:
+                message = self.conn.recv()
+                kind = message[0]
+                if kind == "ready":
+                    self.rss_mb = message[1]
+                    self.ready.set()
+                    continue
+                if kind in ("result", "end", "error"):
+                    self.rss_mb = message[-1]
+                with self.pending_lock:
+                    replies = self.pending.get(message[1])
+                if replies is not None:
+                    replies.put(message)
+        except (EOFError, OSError):
+            pass
+        # The worker exited or crashed: fail whatever it still owed
+        self.closed = True
+        self.ready.set()
+        with self.pending_lock:
+            for request_id, replies in self.pending.items():
+                replies.put(self._lost(request_id))
+
+    def _lost(self, request_id: int) -> tuple:
+        if self.failure:
+            return ("error", request_id, self.failure, False, self.rss_mb)
+        if self.draining:
+            # A drained worker exits once idle; requests it never read go to its successor
+            return ("retry", request_id)
+        return ("error", request_id, "inference worker exited", False, self.rss_mb)
+
+    def send(self, message: tuple) -> None:
+        with self.send_lock:
+            self.conn.send(message)
+
+    def request(self, request_id: int, message: tuple) -> "queue.Queue[tuple]":
+        replies: "queue.Queue[tuple]" = queue.Queue()
+        with self.pending_lock:
+            self.pending[request_id] = replies
+        self.served += 1
+        try:
+            self.send(message)
+        except (OSError, ValueError):
+            replies.put(self._lost(request_id))
+        return replies
+
+    def done(self, request_id: int) -> None:
+        with self.pending_lock:
+            self.pending.pop(request_id, None)
+
+    def cancel(self, request_id: int) -> None:
+        try:
+            self.send(("cancel", request_id))
+        except (OSError, ValueError):
+            pass
+
+    def kill(self, reason: str) -> None:
+        """Ends a hung worker; its pending requests fail with ``reason``."""
+        self.failure = reason
+        self.process.kill()
+
+    def drain(self) -> None:
+        """Lets in-flight requests finish, after which the worker exits.
+
+        Requests that reach it afterwards are answered with "retry" and resent
+        to the active worker.
+        """
+        self.draining = True
+        try:
+            self.send(("drain",))
+        except (OSError, ValueError):
+            pass
+
+class InferenceSupervisor:
+    """Runs generation in a spawned worker process and recycles it before it degrades.
+
+    A worker is replaced after ``max_requests`` requests or once its RSS
+    passes ``max_rss_mb``. The replacement is started and warmed while the old
+    worker keeps serving, so recycling never makes a request wait for a cold
+    model; the old worker then drains its in-flight requests and exits. A
+    crashed worker fails its pending requests and is restarted on the next one;
+    so is a hung one, once a request has had no reply for
+    INFERENCE_WORKER_REQUEST_TIMEOUT seconds.
+    """
+
+    def __init__(self, max_requests: int = INFERENCE_WORKER_MAX_REQUESTS,
+                 max_rss_mb: float = INFERENCE_WORKER_MAX_RSS_MB):
+        self.max_requests = max_requests
+        self.max_rss_mb = max_rss_mb
+        self.lock = threading.Lock()
+        self.active: Optional[WorkerHandle] = None
+        self.standby: Optional[WorkerHandle] = None
+        self.model_names: List[str] = []
+        self.request_ids = itertools.count()
+        self.standby_retry_at = 0.0
+        self.stats = {"started": 0, "recycled": 0, "crashed": 0, "standby_failed": 0, "timed_out": 0}
+
+    def _spawn(self) -> WorkerHandle:
+        handle = WorkerHandle(list(self.model_names))
+        self.stats["started"] += 1
+        return handle
+
+    def start(self, model_names: List[str] = None) -> None:
+        """Starts the first worker with ``model_names`` preloaded and waits until it is warm."""
+        with self.lock:
+            for model_name in model_names or []:
+                if model_name not in self.model_names:
+                    self.model_names.append(model_name)
+        self._worker()
+
+    def _worker(self) -> WorkerHandle:
+        with self.lock:
+            if self.active is not None and not self.active.alive:
+                self.stats["crashed"] += 1
+                self.active = None
+            if self.active is None:
+                self.active = self._spawn()
+            handle = self.active
+        if not handle.ready.wait(INFERENCE_WORKER_START_TIMEOUT) or not handle.alive:
+            raise RuntimeError("Inference worker failed to start")
+        return handle
+
+    def _maybe_recycle(self, handle: WorkerHandle) -> None:
+        worn = handle.served >= self.max_requests or handle.rss_mb >= self.max_rss_mb
+        with self.lock:
+            if not worn or handle is not self.active or self.standby is not None:
+                return
+            if time.monotonic() < self.standby_retry_at:
+                return
+            for model_name in handle.models:
+                if model_name not in self.model_names:
+                    self.model_names.append(model_name)
+            self.standby = self._spawn()
+        threading.Thread(target=self._promote, name="inference-worker-standby", daemon=True).start()
+
+    def _promote(self) -> None:
+        standby = self.standby
+        ready = standby.ready.wait(INFERENCE_WORKER_START_TIMEOUT)
+        if ready and standby.alive:
+            with self.lock:
+                self.standby = None
+                previous, self.active = self.active, standby
+                self.stats["recycled"] += 1
+            if previous is not None:
+                previous.drain()
+            return
+        if standby.alive:
+            # Still loading after the timeout; promoting it would put requests on a cold model
+            standby.kill("Standby inference worker did not become ready")
+        # Keep serving from the current worker and try again later
+        with self.lock:
+            self.standby = None
+            self.stats["standby_failed"] += 1
+            self.standby_retry_at = time.monotonic() + STANDBY_RETRY_SECONDS
+
+    def _reply(self, handle: WorkerHandle, request_id: int, replies: "queue.Queue[tuple]",
+               tokens: List[Any], cancelled: List[bool]) -> tuple:
+        # Cancel tokens cannot cross the process boundary, so they are watched here
+        deadline = time.monotonic() + INFERENCE_WORKER_REQUEST_TIMEOUT
+        while True:
+            try:
+                return replies.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if not cancelled[0] and tokens and all(token is not None and token.cancelled for token in tokens):
+                    handle.cancel(request_id)
+                    cancelled[0] = True
+                if INFERENCE_WORKER_REQUEST_TIMEOUT and time.monotonic() > deadline and handle.failure is None:
+                    # The reader then fails every request the worker still owes and the
+                    # next request starts a replacement
+                    with self.lock:
+                        self.stats["timed_out"] += 1
+                    handle.kill(f"inference worker did not reply within {INFERENCE_WORKER_REQUEST_TIMEOUT}s")
+
+    @staticmethod
+    def _raise(message: tuple, stage: str) -> None:
+        _, _, error, was_cancelled, _ = message
+        if was_cancelled:
+            record_abandoned(stage)
+            raise Cancelled(stage)
+        raise RuntimeError(error)
+
+    def generate(self, prompts: List[str], model_name: str = LLM_MODEL, cancel_tokens: List[Any] = None,
+                 **kwargs) -> List[str]:
+        tokens = cancel_tokens or [current_token()] * len(prompts)
+        message = ("retry",)
+        while message[0] == "retry":
+            handle = self._worker()
+            handle.models.add(model_name)
+            request_id = next(self.request_ids)
+            replies = handle.request(request_id, ("generate", request_id, prompts, model_name, kwargs))
+            try:
+                message = self._reply(handle, request_id, replies, tokens, [False])
+            finally:
+                handle.done(request_id)
+                self._maybe_recycle(handle)
+        if message[0] == "error":
+            self._raise(message, "generation")
+        return message[2]
+
+    def stream(self, prompt: str, model_name: str = LLM_MODEL, **kwargs) -> Iterator[str]:
+        token = current_token()
+        retry = True
+        while retry:
+            handle = self._worker()
+            handle.models.add(model_name)
+            request_id = next(self.request_ids)
+            replies = handle.request(request_id, ("stream", request_id, prompt, model_name, kwargs))
+            cancelled = [False]
+            finished = False
+            try:
+                while True:
+                    message = self._reply(handle, request_id, replies, [token], cancelled)
+                    if message[0] == "chunk":
+                        yield message[2]
+                        retry = False
+                        continue
+                    finished = True
+                    if message[0] == "retry" and not retry:
+                        # Chunks were already yielded, so it cannot start over
+                        message = ("error", request_id, "inference worker exited", False, handle.rss_mb)
+                    retry = message[0] == "retry"
+                    if message[0] == "error":
+                        self._raise(message, "stream")
+                    break
+            finally:
+                handle.done(request_id)
+                if not finished:
+                    # The consumer went away, e.g. Streamlit interrupted the script
+                    handle.cancel(request_id)
+                    record_abandoned("stream")
+                self._maybe_recycle(handle)
+        check_cancelled("stream", token)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            active = self.active
+            return dict(
+                self.stats,
+                pid=active.process.pid if active else None,
+                served=active.served if active else 0,
+                rss_mb=round(active.rss_mb, 1) if active else 0.0,
+                uptime_s=round(time.monotonic() - active.started, 1) if active else 0.0,
+                standby=self.standby is not None
+            )
+
+supervisor = InferenceSupervisor()
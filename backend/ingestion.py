@@ -0,0 +1,179 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List
+from utils.content_fetcher import fetch_webpage_content, is_fetch_error
+from config import (
+    DOCUMENT_SPLIT_LENGTH, DOCUMENT_SPLIT_OVERLAP, INGEST_FETCH_WORKERS, INGEST_CONVERT_WORKERS,
+    INGEST_QUEUE_SIZE, INGEST_WRITE_BATCH_SIZE
+)
+
+# Converter processes are spawned, never forked: the parent runs fetch
+# threads and may hold models, neither of which survives a fork. A spawned
+# child imports only this module, which builds nothing at import time.
+_context = mp.get_context("spawn")
+
+class StageStats:
+    """Counts items and busy time for one pipeline stage."""
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float, items: int = 1):
+        with self.lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+    def report(self, wall_seconds: float) -> Dict[str, float]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / wall_seconds, 2) if wall_seconds else 0.0
+        }
+
+def _fetch_stage(items: queue.Queue, converts, skipped: List[tuple], stats: StageStats):
+    """I/O stage: fetches web pages and checks files, hands raw work to the CPU stage."""
+    while True:
+        item = items.get()
+        if item is None:
+            return
+        started = time.perf_counter()
+        error = None
+        if item.startswith("http"):
+            content = fetch_webpage_content(item)
+            if is_fetch_error(content):
+                error = content
+            work = (item, "html", content)
+        elif os.path.exists(item):
+            work = (item, "pdf" if item.endswith(".pdf") else "text", item)
+        else:
+            error = f"File '{item}' not found"
+        stats.record(time.perf_counter() - started)
+        if error:
+            skipped.append((item, error))
+            continue
+        converts.put(work)  # blocks while the CPU stage is saturated
+
+def _convert_stage(converts, writes):
+    """CPU stage: one converter and preprocessor per worker process, reused for every file."""
+    from haystack.nodes import PDFToTextConverter, PreProcessor, TextConverter
+
+    pdf_converter = PDFToTextConverter()
+    text_converter = TextConverter()
+    preprocessor = PreProcessor(
+        clean_empty_lines=True,
+        clean_whitespace=True,
+        split_by='word',
+        split_length=DOCUMENT_SPLIT_LENGTH,
+        split_overlap=DOCUMENT_SPLIT_OVERLAP,
+        split_respect_sentence_boundary=True,
+        progress_bar=False
+    )
+    while True:
+        work = converts.get()
+        if work is None:
+            writes.put(None)
+            return
+        item, kind, payload = work
+        started = time.perf_counter()
+        try:
+            if kind == "html":
+                raw_text = payload
+            else:
+                converter = pdf_converter if kind == "pdf" else text_converter
+                converted = converter.convert(file_path=payload)
+                raw_text = converted[0].content if isinstance(converted, list) and converted else ""
+            docs = preprocessor.process([{"content": raw_text}]) if raw_text else []
+        except Exception as e:
+            # Report the file and keep serving; a dead worker would never send its sentinel
+            writes.put((item, [], time.perf_counter() - started, f"{type(e).__name__}: {e}"))
+            continue
+        writes.put((item, docs, time.perf_counter() - started, None))
+
+def ingest_documents(files_or_urls: List[str], document_store: Any) -> Dict[str, Dict[str, float]]:
+    """Fetches, converts and splits files and web pages into ``document_store``.
+
+    Runs as three stages connected by bounded queues: fetch threads, spawned
+    converter processes and a batched document store writer. Items that cannot
+    be fetched or converted are reported and skipped. Returns per-stage
+    throughput.
+    """
+    started = time.perf_counter()
+    fetch_stats, convert_stats, write_stats = StageStats("fetch"), StageStats("convert"), StageStats("write")
+    skipped = []
+
+    items = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    converts = _context.Queue(maxsize=INGEST_QUEUE_SIZE)
+    writes = _context.Queue(maxsize=INGEST_QUEUE_SIZE)
+
+    convert_workers = INGEST_CONVERT_WORKERS or max(1, (os.cpu_count() or 2) - 1)
+    fetchers = [
+        threading.Thread(target=_fetch_stage, args=(items, converts, skipped, fetch_stats), daemon=True)
+        for _ in range(min(INGEST_FETCH_WORKERS, len(files_or_urls)))
+    ]
+    converters = [
+        _context.Process(target=_convert_stage, args=(converts, writes), daemon=True)
+        for _ in range(min(convert_workers, len(files_or_urls)))
+    ]
+    for worker in converters + fetchers:
+        worker.start()
+
+    def feed():
+        for item in files_or_urls:
+            items.put(item)
+        for _ in fetchers:
+            items.put(None)
+        for fetcher in fetchers:
+            fetcher.join()
+        for _ in converters:
+            converts.put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    batch = []
+
+    def flush():
+        write_started = time.perf_counter()
+        document_store.write_documents(batch)
+        write_stats.record(time.perf_counter() - write_started, len(batch))
+        batch.clear()
+
+    finished = 0
+    while finished < len(converters):
+        try:
+            result = writes.get(timeout=1)
+        except queue.Empty:
+            if not any(converter.is_alive() for converter in converters):
+                break  # a worker died without its sentinel, e.g. in its converter's setup
+            continue
+        if result is None:
+            finished += 1
+            continue
+        item, docs, seconds, error = result
+        convert_stats.record(seconds)
+        if error:
+            skipped.append((item, error))
+            continue
+        if not docs:
+            print(f"Warning: No text extracted from {item}")
+            continue
+        batch.extend(docs)
+        if len(batch) >= INGEST_WRITE_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    if finished == len(converters):
+        feeder.join()  # otherwise it may be blocked on a queue nobody reads; it is a daemon
+    for converter in converters:
+        converter.join()
+
+    for item, error in skipped:
+        print(f"Warning: Skipping {item}: {error}")
+    wall_seconds = time.perf_counter() - started
+    return {s.name: s.report(wall_seconds) for s in (fetch_stats, convert_stats, write_stats)}
@@ -0,0 +1,227 @@
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+from config import JOB_DB_PATH, JOB_WORKERS, JOB_RETENTION_SECONDS
+from backend.circuit_breaker import reset_degraded, was_degraded
+from utils.cancellation import CancelToken, Cancelled, cancellation_scope, check_cancelled, record_abandoned
+
+# feature -> (module, function, streams partial results)
+JOB_HANDLERS = {
+    "summary": ("backend.summarization", "stream_summary", True),
+    "task": ("backend.task_manager", "stream_task_steps", True),
+    "quiz": ("backend.quiz_generator", "generate_quiz", False),
+}
+
+# feature -> (module, function) giving an instant rule-based result to show while the job runs
+JOB_PREVIEWS = {
+    "summary": ("backend.summarization", "preview_summary"),
+    "quiz": ("backend.quiz_generator", "preview_quiz"),
+}
+
+PARTIAL_UPDATE_SECONDS = 0.25
+
+class JobQueue:
+    """SQLite-backed job queue so long requests survive Streamlit reruns.
+
+    Sessions subscribe to a job by submitting it and drop it with ``release``;
+    a job nobody is subscribed to any more is cancelled.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH, workers: int = JOB_WORKERS):
+        self.path = path
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.threads = []
+        self.db = None
+        self.subscribers: Dict[str, int] = {}
+        self.tokens: Dict[str, CancelToken] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, feature TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+                "partial TEXT, result TEXT, error TEXT, degraded INTEGER NOT NULL DEFAULT 0, preview TEXT, "
+                "created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(jobs)")]
+            if "degraded" not in columns:
+                self.db.execute("ALTER TABLE jobs ADD COLUMN degraded INTEGER NOT NULL DEFAULT 0")
+            if "preview" not in columns:
+                self.db.execute("ALTER TABLE jobs ADD COLUMN preview TEXT")
+            # Jobs that were running when the process stopped are picked up again
+            self.db.execute("UPDATE jobs SET status = 'queued', partial = NULL WHERE status = 'running'")
+            self.db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND updated < ?",
+                (time.time() - JOB_RETENTION_SECONDS,)
+            )
+            self.db.commit()
+        return self.db
+
+    def _ensure_workers(self) -> None:
+        if self.threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, feature: str, params: Dict[str, Any]) -> str:
+        if feature not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job feature: {feature}")
+        encoded = json.dumps(params, sort_keys=True)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.wakeup:
+            db = self._connect()
+            # An identical job still queued or running is shared instead of duplicated
+            existing = db.execute(
+                "SELECT id FROM jobs WHERE feature = ? AND params = ? AND status IN ('queued', 'running')",
+                (feature, encoded)
+            ).fetchone()
+            if existing:
+                self.subscribers[existing[0]] = self.subscribers.get(existing[0], 0) + 1
+                return existing[0]
+            db.execute(
+                "INSERT INTO jobs (id, feature, params, status, created, updated) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, feature, encoded, now, now)
+            )
+            db.commit()
+            self.subscribers[job_id] = 1
+            self._ensure_workers()
+            self.wakeup.notify()
+        return job_id
+
+    def release(self, job_id: str) -> None:
+        """Drops one subscriber; the last one cancels the job if it has not finished."""
+        with self.lock:
+            remaining = self.subscribers.get(job_id, 0) - 1
+            if remaining > 0:
+                self.subscribers[job_id] = remaining
+                return
+            self.subscribers.pop(job_id, None)
+            db = self._connect()
+            cursor = db.execute(
+                "UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            db.commit()
+            if cursor.rowcount:
+                record_abandoned("job")
+            token = self.tokens.get(job_id)
+        if token is not None:
+            token.cancel()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            self._ensure_workers()
+            row = self._connect().execute(
+                "SELECT feature, params, status, partial, result, error, degraded, preview FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        feature, params, status, partial, result, error, was_degraded, preview = row
+        return {
+            "id": job_id,
+            "feature": feature,
+            "params": json.loads(params),
+            "status": status,
+            "partial": json.loads(partial) if partial else None,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "degraded": bool(was_degraded),
+            "preview": json.loads(preview) if preview else None
+        }
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            db = self._connect()
+            db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            db.commit()
+
+    def _claim(self):
+        db = self._connect()
+        row = db.execute(
+            "SELECT id, feature, params FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+        ).fetchone()
+        if row:
+            db.execute("UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (time.time(), row[0]))
+            db.commit()
+        return row
+
+    def _work(self) -> None:
+        while True:
+            with self.wakeup:
+                row = self._claim()
+                while row is None:
+                    self.wakeup.wait(timeout=5)
+                    row = self._claim()
+                job_id, feature, params = row
+                # Registered under the lock so a release racing the claim still finds it
+                token = self.tokens[job_id] = CancelToken()
+            reset_degraded()
+            try:
+                with cancellation_scope(token):
+                    result = self._run(job_id, feature, json.loads(params))
+                self._update(job_id, status="done", result=json.dumps(result), degraded=int(was_degraded()))
+            except Cancelled:
+                # The stage that noticed the cancellation has already been counted
+                self._update(job_id, status="cancelled")
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e))
+            finally:
+                with self.lock:
+                    self.tokens.pop(job_id, None)
+                    self.subscribers.pop(job_id, None)
+
+    def _run(self, job_id: str, feature: str, params: Dict[str, Any]) -> Any:
+        module_name, function_name, streams = JOB_HANDLERS[feature]
+        handler = getattr(importlib.import_module(module_name), function_name)
+        if params.get("url") and feature in JOB_PREVIEWS:
+            params = self._preview(job_id, feature, params)
+        if not streams:
+            return handler(**params)
+
+        # Summaries stream text pieces, task breakdowns stream whole steps
+        pieces = []
+        last_update = 0.0
+        for piece in handler(**params):
+            check_cancelled("job")
+            pieces.append(piece)
+            if time.perf_counter() - last_update > PARTIAL_UPDATE_SECONDS:
+                self._update(job_id, partial=json.dumps(self._combine(feature, pieces)))
+                last_update = time.perf_counter()
+        return self._combine(feature, pieces)
+
+    def _preview(self, job_id: str, feature: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetches a URL job's page once and publishes its preview; returns the params with the content."""
+        from backend.summarization import process_url
+
+        content = process_url(params["url"])
+        module_name, function_name = JOB_PREVIEWS[feature]
+        preview_params = {name: value for name, value in params.items() if name != "regenerate"}
+        preview = getattr(importlib.import_module(module_name), function_name)(
+            **dict(preview_params, url=None, content=content)
+        )
+        if preview:
+            self._update(job_id, preview=json.dumps(preview))
+        return dict(params, content=content)
+
+    @staticmethod
+    def _combine(feature: str, pieces: list) -> Any:
+        return "".join(pieces) if feature == "summary" else list(pieces)
+
+job_queue = JobQueue()
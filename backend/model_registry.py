@@ -0,0 +1,228 @@
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+from config import (
+    LLM_MODEL, INFERENCE_BACKEND, ONNX_MODEL_DIR, MODEL_ARTIFACT_DIR, OFFLINE_MODE,
+    INFERENCE_SCHEDULER_ENABLED, RESULT_CACHE_ENABLED, MODEL_ROUTING_ENABLED
+)
+
+if OFFLINE_MODE:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+_pipelines: Dict[Tuple[str, str], Any] = {}
+_pipelines_lock = threading.Lock()
+_tokenizers: Dict[str, Any] = {}
+
+def resolve_model_path(model_name: str) -> str:
+    """Prefers a copy of the model in MODEL_ARTIFACT_DIR over the Hugging Face hub."""
+    local_path = os.path.join(MODEL_ARTIFACT_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(local_path):
+        return local_path
+    if OFFLINE_MODE:
+        raise FileNotFoundError(f"Model {model_name} not found in {MODEL_ARTIFACT_DIR} and offline mode is on")
+    return model_name
+
+def _load_onnx(model_name: str) -> Any:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    # Export once and reuse the saved encoder/decoder graphs on later starts
+    export_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+    else:
+        model = ORTModelForSeq2SeqLM.from_pretrained(resolve_model_path(model_name), export=True, use_cache=True)
+        model.save_pretrained(export_dir)
+    tokenizer = AutoTokenizer.from_pretrained(resolve_model_path(model_name))
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+
+def _load(model_name: str, backend: str) -> Any:
+    if backend == "onnx":
+        return _load_onnx(model_name)
+
+    from haystack.nodes import PromptModel
+    pipe = PromptModel(model_name_or_path=resolve_model_path(model_name)).model_invocation_layer.pipe
+    if backend == "pytorch_int8":
+        import torch
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend != "pytorch":
+        raise ValueError(f"Unknown inference backend: {backend}")
+    return pipe
+
+def get_pipeline(model_name: str = LLM_MODEL, backend: str = INFERENCE_BACKEND) -> Any:
+    """Returns the process-wide transformers pipeline for ``model_name``, loading it on first use.
+
+    ``backend`` selects how the weights are served: fp32 PyTorch through
+    haystack's PromptModel, int8 dynamically quantized PyTorch, or an exported
+    ONNX Runtime graph.
+    """
+    key = (model_name, backend)
+    pipe = _pipelines.get(key)
+    if pipe is None:
+        with _pipelines_lock:
+            pipe = _pipelines.get(key)
+            if pipe is None:
+                pipe = _load(model_name, backend)
+                _pipelines[key] = pipe
+    return pipe
+
+def get_tokenizer(model_name: str = LLM_MODEL) -> Any:
+    """Returns the model's tokenizer without loading the weights if they are not resident."""
+    pipe = _pipelines.get((model_name, INFERENCE_BACKEND))
+    if pipe is not None:
+        return pipe.tokenizer
+    with _pipelines_lock:
+        tokenizer = _tokenizers.get(model_name)
+        if tokenizer is None:
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(resolve_model_path(model_name))
+            _tokenizers[model_name] = tokenizer
+    return tokenizer
+
+def loaded_models() -> List[str]:
+    return [f"{model_name} ({backend})" for model_name, backend in _pipelines]
+
+class PromptInvoker:
+    """Binds a prompt template to a shared model.
+
+    Creating an invoker is cheap: it only renders the template, and all
+    generation goes through the registry's model, so every template using the
+    same model name shares one copy of the weights. With the inference
+    scheduler enabled, calls from all sessions are micro-batched together.
+    """
+
+    def __init__(self, template: str, model_name: str = LLM_MODEL, backend: str = "local",
+                 feature: str = None, max_new_tokens: int = None):
+        self.template = template
+        self.model_name = model_name
+        self.backend = backend
+        self.feature = feature or "default"
+        self.generation_defaults = {"max_new_tokens": max_new_tokens} if max_new_tokens else {}
+
+    def model_for(self, prompt: str) -> str:
+        if self.backend == "server":
+            from config import INFERENCE_SERVER_MODEL
+            return f"server:{INFERENCE_SERVER_MODEL}"
+        if MODEL_ROUTING_ENABLED:
+            from backend.model_router import router
+            return router.route(prompt, self.feature, self.model_name)
+        return self.model_name
+
+    def render(self, **kwargs) -> str:
+        values = {}
+        for key, value in kwargs.items():
+            if isinstance(value, (list, tuple)):
+                value = " ".join(getattr(item, "content", item) for item in value)
+            values[key] = value
+        return self.template.format(**values)
+
+    def batch(self, inputs: List[Dict[str, Any]], batch_size: int = None, use_cache: bool = True,
+              **generation_kwargs) -> List[str]:
+        from backend.result_cache import cache_key, result_cache
+        from utils.cancellation import Cancelled, check_cancelled, current_token
+        from utils.single_flight import single_flight
+
+        check_cancelled("generation")
+        generation_kwargs = dict(self.generation_defaults, **generation_kwargs)
+        prompts = [self.render(**values) for values in inputs]
+        models = [self.model_for(prompt) for prompt in prompts]
+        keys = [cache_key(model, self.template, generation_kwargs, prompt) for model, prompt in zip(models, prompts)]
+        outputs: List[Any] = [None] * len(prompts)
+        if RESULT_CACHE_ENABLED and use_cache:
+            outputs = [result_cache.get(key) for key in keys]
+
+        # Identical prompts already being generated for another session are
+        # awaited instead of generated again.
+        leaders: Dict[str, List[int]] = {}
+        followers = []
+        # Claims not finished yet; all of them are failed if anything below raises
+        claimed: List[int] = []
+        try:
+            for i, output in enumerate(outputs):
+                if output is None:
+                    future, leader = single_flight.claim(("generate", keys[i]))
+                    if leader:
+                        claimed.append(i)
+                        leaders.setdefault(models[i], []).append(i)
+                    else:
+                        followers.append((i, future))
+
+            for model_name, indices in leaders.items():
+                generated = self._generate(model_name, [prompts[i] for i in indices], batch_size, generation_kwargs)
+                # Output of cancelled work may be cut short and must not be cached
+                check_cancelled("generation")
+                for i, output in zip(indices, generated):
+                    outputs[i] = output
+                    if RESULT_CACHE_ENABLED:
+                        result_cache.put(keys[i], output)
+                    claimed.remove(i)
+                    single_flight.finish(("generate", keys[i]), output)
+        except BaseException as e:
+            for i in claimed:
+                single_flight.finish(("generate", keys[i]), error=e)
+            raise
+
+        for i, future in followers:
+            try:
+                outputs[i] = future.result()
+            except Cancelled:
+                # The leader's session went away; this caller still wants the result
+                token = current_token()
+                if token is not None and token.cancelled:
+                    raise
+                outputs[i] = self.batch([inputs[i]], batch_size, use_cache, **generation_kwargs)[0]
+        return outputs
+
+    def _generate(self, model_name: str, prompts: List[str], batch_size: int,
+                  generation_kwargs: Dict[str, Any]) -> List[str]:
+        if self.backend == "server":
+            from backend.inference_server import get_client
+            return get_client().complete_many(prompts, **generation_kwargs)
+
+        if INFERENCE_SCHEDULER_ENABLED:
+            from backend.inference_scheduler import scheduler
+            futures = scheduler.submit_many(prompts, model_name, max_batch_size=batch_size, **generation_kwargs)
+            return [future.result() for future in futures]
+
+        from backend.generation import generate
+        if batch_size:
+            generation_kwargs = dict(generation_kwargs, batch_size=batch_size)
+        return generate(prompts, model_name=model_name, **generation_kwargs)
+
+    def stream(self, use_cache: bool = True, generation_kwargs: Dict[str, Any] = None, **kwargs) -> Iterator[str]:
+        """Yields the generation for one set of template values as it is decoded.
+
+        Local streaming runs outside the scheduler since a batch would hold
+        every token until the slowest request finishes. Cached results are
+        yielded whole.
+        """
+        generation_kwargs = dict(self.generation_defaults, **(generation_kwargs or {}))
+        prompt = self.render(**kwargs)
+        model_name = self.model_for(prompt)
+        key = None
+        if RESULT_CACHE_ENABLED:
+            from backend.result_cache import cache_key, result_cache
+            key = cache_key(model_name, self.template, generation_kwargs, prompt)
+            cached = result_cache.get(key) if use_cache else None
+            if cached is not None:
+                yield cached
+                return
+
+        if self.backend == "server":
+            from backend.inference_server import get_client
+            tokens = get_client().stream(prompt, **generation_kwargs)
+        else:
+            from backend.generation import stream
+            tokens = stream(prompt, model_name=model_name, **generation_kwargs)
+
+        pieces = []
+        for text in tokens:
+            pieces.append(text)
+            yield text
+        if key:
+            result_cache.put(key, "".join(pieces))
+
+    def __call__(self, use_cache: bool = True, **kwargs) -> Dict[str, Any]:
+        # Callers read the pipeline-style {"results": [...]} output.
+        return {"results": self.batch([kwargs], use_cache=use_cache)}
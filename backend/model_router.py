@@ -0,0 +1,30 @@
+import threading
+from collections import Counter
+from typing import Dict
+from config import ROUTING_SMALL_MODEL, ROUTING_THRESHOLD_TOKENS
+
+class SizeRouter:
+    """Sends prompts up to ROUTING_THRESHOLD_TOKENS to the small model and longer ones to the feature's model."""
+
+    def __init__(self, small_model: str = ROUTING_SMALL_MODEL, threshold_tokens: int = ROUTING_THRESHOLD_TOKENS):
+        self.small_model = small_model
+        self.threshold_tokens = threshold_tokens
+        self.decisions = Counter()
+        self.lock = threading.Lock()
+
+    def route(self, prompt: str, feature: str, large_model: str) -> str:
+        from backend.model_registry import get_tokenizer
+        tokens = len(get_tokenizer(self.small_model)(prompt)["input_ids"])
+        model_name = self.small_model if tokens <= self.threshold_tokens else large_model
+        with self.lock:
+            self.decisions[(feature, model_name)] += 1
+        return model_name
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            routed: Dict[str, Dict[str, int]] = {}
+            for (feature, model_name), count in self.decisions.items():
+                routed.setdefault(feature, {})[model_name] = count
+            return routed
+
+router = SizeRouter()
@@ -1,9 +1,12 @@
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Tuple, Union
 import re
 import json
 from utils.fallback_detector import HAYSTACK_AVAILABLE
-from config import MAX_QUIZ_QUESTIONS
+from config import (
+    MAX_QUIZ_QUESTIONS, QUIZ_INFERENCE_BACKEND, QUIZ_MODEL, QUIZ_MAX_NEW_TOKENS, QUIZ_CONSTRAINED_DECODING
+)
 from backend.summarization import process_url
+from utils.content_fetcher import is_fetch_error
 from backend.core import tamer
 
 def generate_simple_quiz(content: str, num_questions: int = 3) -> List[Dict[str, Any]]:
@@ -41,6 +44,14 @@ def generate_simple_quiz(content: str, num_questions: int = 3) -> List[Dict[str,
     
     return quiz
 
+def preview_quiz(content: str = None, url: str = None, num_questions: int = 3) -> List[Dict[str, Any]]:
+    """Instant rule-based quiz shown while the model quiz is generated."""
+    if url and not content:
+        content = process_url(url)
+    if not content or is_fetch_error(content):
+        return None
+    return generate_simple_quiz(content, num_questions)
+
 def parse_non_json_quiz_format(raw_text: str) -> List[Dict[str, Any]]:
     questions = []
     current_question = {}
@@ -75,63 +86,111 @@ def parse_non_json_quiz_format(raw_text: str) -> List[Dict[str, Any]]:
     
     return questions
 
+def parse_json_quiz(raw_text: str) -> List[Dict[str, Any]]:
+    questions_raw = raw_text if "[" in raw_text else f"[{raw_text}]"
+    try:
+        questions = json.loads(questions_raw)
+    except json.JSONDecodeError:
+        return parse_non_json_quiz_format(raw_text)
+    if isinstance(questions, dict):
+        questions = [questions]
+    return [question for question in questions if isinstance(question, dict)] if isinstance(questions, list) else []
+
+def spread_questions(num_packs: int, num_questions: int) -> List[Tuple[int, int]]:
+    """(pack index, question count) pairs spreading the questions evenly over the document."""
+    used = min(num_packs, num_questions)
+    return [
+        (round(i * (num_packs - 1) / max(used - 1, 1)), num_questions // used + (i < num_questions % used))
+        for i in range(used)
+    ]
+
 if HAYSTACK_AVAILABLE:
     try:
-        from haystack.nodes import PromptNode, PromptTemplate
-        from config import LLM_MODEL
+        from backend.model_registry import PromptInvoker
+        from backend.circuit_breaker import breakers, degraded
+        from backend.token_packing import pack_chunks, prompt_budget
+        from backend.constrained_decoding import QUIZ_FORMAT, parse_quiz_text, question_token_budget
         
-        quiz_prompt = PromptNode(
-            model_name_or_path=LLM_MODEL,
-            default_prompt_template=PromptTemplate(
-                "Generate {num_questions} multiple-choice questions with one correct answer and three incorrect alternatives from the following text. Format your response as a JSON array with 'question', 'options' (array of 4 strings), and 'answer' (the correct option string) for each question: {documents}"
-            )
+        # Local models decode under the quiz schema; a remote server gets the JSON prompt
+        constrained = QUIZ_CONSTRAINED_DECODING and QUIZ_INFERENCE_BACKEND == "local"
+        if constrained:
+            quiz_template = "Generate {num_questions} multiple-choice questions with one correct answer and three incorrect alternatives from the following text. Write each question as: " + QUIZ_FORMAT + ". Text: {documents}"
+        else:
+            quiz_template = "Generate {num_questions} multiple-choice questions with one correct answer and three incorrect alternatives from the following text. Format your response as a JSON array with 'question', 'options' (array of 4 strings), and 'answer' (the correct option string) for each question: {documents}"
+        quiz_prompt = PromptInvoker(
+            quiz_template,
+            model_name=QUIZ_MODEL, backend=QUIZ_INFERENCE_BACKEND, feature="quiz",
+            max_new_tokens=QUIZ_MAX_NEW_TOKENS
         )
+        quiz_breaker = breakers["quiz"]
         
-        def generate_quiz(content: str = None, url: str = None, num_questions: int = 3) -> List[Dict[str, Any]]:
+        def generate_quiz(content: str = None, url: str = None, num_questions: int = 3,
+                          regenerate: bool = False) -> List[Dict[str, Any]]:
             try:
                 if num_questions <= 0 or num_questions > MAX_QUIZ_QUESTIONS:
                     num_questions = 3
                 
-                if url:
+                if url and not content:
                     content = process_url(url)
                 
                 if not content:
                     return []
-                    
-                processed_docs = tamer.process_text(content)
-                if not processed_docs:
-                    return []
                 
-                response = quiz_prompt(documents=processed_docs, num_questions=num_questions)
+                if not quiz_breaker.allow():
+                    return degraded(generate_simple_quiz(content, num_questions))
+                
+                with quiz_breaker.track():
+                    processed_docs = tamer.process_text(content)
+                    if not processed_docs:
+                        return []
+                    
+                    budget = prompt_budget(quiz_prompt.render(documents="", num_questions=num_questions))
+                    packed = pack_chunks([doc.content for doc in processed_docs], budget)
+                    if not packed:
+                        return []
+                    # Each pack asks for its share of the questions, so the quiz covers the whole document
+                    shares = spread_questions(len(packed), num_questions)
+                    outputs = [None] * len(shares)
+                    # Packs asking for the same number of questions share one batch and stop at that count
+                    for count in sorted(set(count for _, count in shares)):
+                        rows = [row for row, (_, share) in enumerate(shares) if share == count]
+                        inputs = [{"documents": packed[shares[row][0]], "num_questions": count} for row in rows]
+                        if constrained:
+                            generated = quiz_prompt.batch(
+                                inputs, use_cache=not regenerate, schema="quiz", max_items=count,
+                                max_new_tokens=count * question_token_budget()
+                            )
+                        else:
+                            generated = quiz_prompt.batch(inputs, use_cache=not regenerate)
+                        for row, output in zip(rows, generated):
+                            outputs[row] = output
                 
-                if isinstance(response, dict) and "results" in response:
-                    try:
-                        questions_raw = response["results"][0]
-                        if "[" not in questions_raw:
-                            questions_raw = f"[{questions_raw}]"
-                            
-                        questions = json.loads(questions_raw)
-                        return questions
-                    except json.JSONDecodeError:
-                        return parse_non_json_quiz_format(response["results"][0])
-                return generate_simple_quiz(content, num_questions)
+                parse = parse_quiz_text if constrained else parse_json_quiz
+                questions = []
+                for (_, count), output in zip(shares, outputs):
+                    questions.extend(parse(output)[:count])
+                if questions:
+                    return questions[:num_questions]
+                return degraded(generate_simple_quiz(content, num_questions))
             except Exception:
-                return generate_simple_quiz(content, num_questions)
+                return degraded(generate_simple_quiz(content, num_questions))
     except Exception:
-        def generate_quiz(content: str = None, url: str = None, num_questions: int = 3) -> List[Dict[str, Any]]:
+        def generate_quiz(content: str = None, url: str = None, num_questions: int = 3,
+                          regenerate: bool = False) -> List[Dict[str, Any]]:
             if num_questions <= 0 or num_questions > MAX_QUIZ_QUESTIONS:
                 num_questions = 3
                 
-            if url:
+            if url and not content:
                 content = process_url(url)
                 
             return generate_simple_quiz(content, num_questions)
 else:
-    def generate_quiz(content: str = None, url: str = None, num_questions: int = 3) -> List[Dict[str, Any]]:
+    def generate_quiz(content: str = None, url: str = None, num_questions: int = 3,
+                      regenerate: bool = False) -> List[Dict[str, Any]]:
         if num_questions <= 0 or num_questions > MAX_QUIZ_QUESTIONS:
             num_questions = 3
             
-        if url:
+        if url and not content:
             content = process_url(url)
             
         return generate_simple_quiz(content, num_questions)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config import RESULT_CACHE_PATH, RESULT_CACHE_MEMORY_ENTRIES, RESULT_CACHE_DISK_ENTRIES
+
+def cache_key(model_name: str, template: str, params: Dict[str, Any], prompt: str) -> str:
+    content_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    material = json.dumps([model_name, template, sorted(params.items()), content_hash], default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Two-tier generation cache: an in-process LRU in front of a SQLite table.
+
+    Both tiers are size bounded; the disk tier evicts the least recently read rows.
+    """
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, memory_entries: int = RESULT_CACHE_MEMORY_ENTRIES,
+                 disk_entries: int = RESULT_CACHE_DISK_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory: "OrderedDict[str, str]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        return self.db
+
+    def _remember(self, key: str, value: str) -> None:
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            try:
+                db = self._connect()
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row:
+                    db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        with self.lock:
+            self._remember(key, value)
+            self.stats["writes"] += 1
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, last_access) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+                (count,) = db.execute("SELECT COUNT(*) FROM results").fetchone()
+                if count > self.disk_entries:
+                    db.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                        (count - self.disk_entries,)
+                    )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def metrics(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+result_cache = ResultCache()
@@ -1,8 +1,11 @@
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Iterator, Union
 import requests
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
+from utils.content_fetcher import extract_text_from_html, is_fetch_error
+from utils.process_pool import run_cpu_bound
+from utils.single_flight import single_flight
+from utils.cancellation import check_cancelled
 from utils.fallback_detector import HAYSTACK_AVAILABLE
 from backend.core import tamer
 
@@ -10,25 +13,31 @@ def fetch_webpage_content(url: str) -> str:
     try:
         response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        for tag in soup(['script', 'style', 'header', 'footer', 'nav']):
-            tag.decompose()
-            
-        paragraphs = soup.find_all("p")
-        text = "\n".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-        
-        if not text:
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
-            if main_content:
-                text = main_content.get_text(separator="\n", strip=True)
-            
+        text = run_cpu_bound(extract_text_from_html, response.text)
         return text if text else "No readable content found."
     except requests.RequestException as e:
         return f"Error fetching webpage: {e}"
 
+def normalize_url(url: str) -> str:
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip("/") or "/"
+    return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), path=path, fragment="").geturl()
+
 def process_url(url: str) -> str:
-    return fetch_webpage_content(url)
+    # Cancellation is checked around the shared fetch, never inside it, so a
+    # cancelled session cannot fail another session waiting on the same URL
+    check_cancelled("fetch")
+    content = single_flight.do(("fetch", normalize_url(url)), fetch_webpage_content, url)
+    check_cancelled("fetch")
+    return content
+
+def preview_summary(content: str = None, url: str = None) -> str:
+    """Instant rule-based summary shown while the model summary is generated."""
+    if url and not content:
+        content = process_url(url)
+    if not content or is_fetch_error(content):
+        return None
+    return simple_summarize(content)
 
 def simple_summarize(content: str) -> str:
     if not content:
@@ -49,42 +58,164 @@ def simple_summarize(content: str) -> str:
 
 if HAYSTACK_AVAILABLE:
     try:
-        from haystack.nodes import PromptNode, PromptTemplate
-        from config import LLM_MODEL
+        from backend.delta_summary import delta_cache
+        from backend.model_registry import PromptInvoker
+        from backend.circuit_breaker import breakers, degraded
+        from backend.generation import count_tokens, fits_context
+        from backend.token_packing import pack_chunks, prompt_budget
+        from backend.inference_scheduler import current_priority, inference_priority
+        from config import SUMMARY_INFERENCE_BACKEND, SUMMARY_MODEL, SUMMARY_MODE, SUMMARY_BATCH_SIZE, SUMMARY_REDUCE_FANOUT, SUMMARY_MAX_NEW_TOKENS
         
-        summary_prompt = PromptNode(
-            model_name_or_path=LLM_MODEL,
-            default_prompt_template=PromptTemplate(
-                "Summarize the following document: {documents}"
-            )
+        summary_prompt = PromptInvoker(
+            "Summarize the following document: {documents}",
+            model_name=SUMMARY_MODEL, backend=SUMMARY_INFERENCE_BACKEND, feature="summary"
         )
+        summary_breaker = breakers["summary"]
+        
+        def summarize_chunks(chunks: List[str], use_cache: bool = True) -> List[str]:
+            # Long documents yield to chat and task requests in the scheduler
+            priority = "bulk" if len(chunks) > SUMMARY_BATCH_SIZE else current_priority()
+            with inference_priority(priority):
+                return summary_prompt.batch(
+                    [{"documents": chunk} for chunk in chunks],
+                    batch_size=SUMMARY_BATCH_SIZE,
+                    use_cache=use_cache,
+                    max_new_tokens=SUMMARY_MAX_NEW_TOKENS
+                )
+        
+        def reduce_rounds(summaries: List[str], use_cache: bool = True) -> List[str]:
+            """Runs the intermediate reduce rounds until the summaries fit one final pass."""
+            fanout = max(2, SUMMARY_REDUCE_FANOUT)
+            reserve = count_tokens(summary_prompt.render(documents=""))
+            while len(summaries) > 1 and not fits_context(" ".join(summaries), reserve):
+                groups = [" ".join(summaries[i:i + fanout]) for i in range(0, len(summaries), fanout)]
+                summaries = summarize_chunks(groups, use_cache)
+            return summaries
+        
+        def reduce_summaries(summaries: List[str], use_cache: bool = True) -> str:
+            summaries = reduce_rounds(summaries, use_cache)
+            if len(summaries) > 1:
+                return summarize_chunks([" ".join(summaries)], use_cache)[0]
+            return summaries[0] if summaries else ""
+        
+        def stream_reduce(summaries: List[str], use_cache: bool = True) -> Iterator[str]:
+            """reduce_summaries that streams the final pass the user is waiting to read."""
+            summaries = reduce_rounds(summaries, use_cache)
+            if len(summaries) > 1:
+                yield from stream_chunk(" ".join(summaries), use_cache)
+            elif summaries:
+                yield summaries[0]
+        
+        def stream_chunk(text: str, use_cache: bool = True) -> Iterator[str]:
+            return summary_prompt.stream(
+                use_cache=use_cache,
+                generation_kwargs={"max_new_tokens": SUMMARY_MAX_NEW_TOKENS},
+                documents=text
+            )
+        
+        def map_reduce_summarize(chunks: List[str], use_cache: bool = True) -> str:
+            packed = pack_chunks(chunks, prompt_budget(summary_prompt.render(documents="")))
+            return reduce_summaries(summarize_chunks(packed, use_cache), use_cache)
         
-        def summarize_content(content: str = None, url: str = None) -> str:
+        def stream_map_reduce(chunks: List[str], use_cache: bool = True) -> Iterator[str]:
+            packed = pack_chunks(chunks, prompt_budget(summary_prompt.render(documents="")))
+            if len(packed) == 1:
+                # Nothing to reduce: stream the one map pass instead
+                return stream_chunk(packed[0], use_cache)
+            return stream_reduce(summarize_chunks(packed, use_cache), use_cache)
+        
+        def summarize_content(content: str = None, url: str = None, regenerate: bool = False) -> str:
             try:
-                if url:
+                if url and not content:
                     content = process_url(url)
                 
                 if not content:
                     return "No content provided for summarization."
-                    
-                processed_docs = tamer.process_text(content)
-                if not processed_docs:
-                    return "Failed to process the content."
-                    
-                summary = summary_prompt(documents=processed_docs)
+                if is_fetch_error(content):
+                    return content
+                
+                if not summary_breaker.allow():
+                    return degraded(simple_summarize(content))
+                
+                with summary_breaker.track():
+                    if url and not regenerate:
+                        return delta_cache.summarize(
+                            url, content, summarize_chunks, reduce_summaries,
+                            budget=prompt_budget(summary_prompt.render(documents=""))
+                        )
+                        
+                    processed_docs = tamer.process_text(content)
+                    if not processed_docs:
+                        return "Failed to process the content."
+                        
+                    if SUMMARY_MODE == "map_reduce":
+                        return map_reduce_summarize([doc.content for doc in processed_docs], not regenerate)
+                        
+                    summary = summary_prompt(documents=processed_docs, use_cache=not regenerate)
                 
                 if isinstance(summary, dict) and "results" in summary:
                     return summary["results"][0]
-                return simple_summarize(content)
+                return degraded(simple_summarize(content))
+            except Exception:
+                return degraded(simple_summarize(content))
+        
+        def stream_summary(content: str = None, url: str = None, regenerate: bool = False) -> Iterator[str]:
+            if url and not content:
+                content = process_url(url)
+            
+            if not content:
+                yield "No content provided for summarization."
+                return
+            if is_fetch_error(content):
+                yield content
+                return
+            
+            if not summary_breaker.allow():
+                yield degraded(simple_summarize(content))
+                return
+            
+            streamed = False
+            try:
+                with summary_breaker.track():
+                    if url and not regenerate:
+                        pieces = delta_cache.stream(
+                            url, content, summarize_chunks, stream_reduce,
+                            budget=prompt_budget(summary_prompt.render(documents=""))
+                        )
+                    else:
+                        processed_docs = tamer.process_text(content)
+                        if not processed_docs:
+                            yield "Failed to process the content."
+                            return
+                        
+                        if SUMMARY_MODE == "map_reduce":
+                            pieces = stream_map_reduce([doc.content for doc in processed_docs], not regenerate)
+                        else:
+                            pieces = summary_prompt.stream(
+                                use_cache=not regenerate,
+                                generation_kwargs={"max_new_tokens": SUMMARY_MAX_NEW_TOKENS},
+                                documents=processed_docs
+                            )
+                    
+                    for text in pieces:
+                        streamed = True
+                        yield text
             except Exception:
-                return simple_summarize(content)
+                if not streamed:
+                    yield degraded(simple_summarize(content))
     except Exception:
-        def summarize_content(content: str = None, url: str = None) -> str:
-            if url:
+        def summarize_content(content: str = None, url: str = None, regenerate: bool = False) -> str:
+            if url and not content:
                 content = process_url(url)
             return simple_summarize(content)
+        
+        def stream_summary(content: str = None, url: str = None, regenerate: bool = False) -> Iterator[str]:
+            yield summarize_content(content, url, regenerate)
 else:
-    def summarize_content(content: str = None, url: str = None) -> str:
-        if url:
+    def summarize_content(content: str = None, url: str = None, regenerate: bool = False) -> str:
+        if url and not content:
             content = process_url(url)
-        return simple_summarize(content)
\ No newline at end of file
+        return simple_summarize(content)
+    
+    def stream_summary(content: str = None, url: str = None, regenerate: bool = False) -> Iterator[str]:
+        yield summarize_content(content, url, regenerate)
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import List
+from typing import Iterator, List
 from utils.fallback_detector import HAYSTACK_AVAILABLE
+from config import TASK_INFERENCE_BACKEND, TASK_MODEL, TASK_MAX_NEW_TOKENS
 
 def simple_task_breakdown(task_description: str) -> List[str]:
     if not task_description:
@@ -50,33 +51,70 @@ def simple_task_breakdown(task_description: str) -> List[str]:
 
 if HAYSTACK_AVAILABLE:
     try:
-        from haystack.nodes import PromptNode, PromptTemplate
-        from config import LLM_MODEL
+        from backend.model_registry import PromptInvoker
+        from backend.circuit_breaker import breakers, degraded
         
-        task_prompt = PromptNode(
-            model_name_or_path=LLM_MODEL,
-            default_prompt_template=PromptTemplate(
-                "Break the following task into smaller steps: {task_description}"
-            )
+        task_prompt = PromptInvoker(
+            "Break the following task into smaller steps: {task_description}",
+            model_name=TASK_MODEL, backend=TASK_INFERENCE_BACKEND, feature="task",
+            max_new_tokens=TASK_MAX_NEW_TOKENS
         )
+        task_breaker = breakers["task"]
         
-        def break_task(task_description: str) -> List[str]:
+        def break_task(task_description: str, regenerate: bool = False) -> List[str]:
             if not task_description:
                 return []
+            
+            if not task_breaker.allow():
+                return degraded(simple_task_breakdown(task_description))
                 
             try:
-                prompt = f"Break the following task into smaller steps: {task_description}"
-                response = task_prompt([prompt])
+                with task_breaker.track():
+                    response = task_prompt(task_description=task_description, use_cache=not regenerate)
                 
                 if isinstance(response, dict) and "results" in response:
                     steps = response["results"][0].split("\n")
                     return [step.strip() for step in steps if step.strip()]
-                return simple_task_breakdown(task_description)
+                return degraded(simple_task_breakdown(task_description))
             except Exception:
-                return simple_task_breakdown(task_description)
+                return degraded(simple_task_breakdown(task_description))
+        
+        def stream_task_steps(task_description: str, regenerate: bool = False) -> Iterator[str]:
+            """Yields each step as soon as its line has been fully decoded."""
+            if not task_description:
+                return
+            
+            if not task_breaker.allow():
+                yield from degraded(simple_task_breakdown(task_description))
+                return
+            
+            emitted = False
+            pending = ""
+            try:
+                with task_breaker.track():
+                    for text in task_prompt.stream(use_cache=not regenerate, task_description=task_description):
+                        pending += text
+                        *lines, pending = pending.split("\n")
+                        for line in lines:
+                            if line.strip():
+                                emitted = True
+                                yield line.strip()
+                    if pending.strip():
+                        emitted = True
+                        yield pending.strip()
+            except Exception:
+                if emitted:
+                    return
+                yield from degraded(simple_task_breakdown(task_description))
     except Exception:
-        def break_task(task_description: str) -> List[str]:
+        def break_task(task_description: str, regenerate: bool = False) -> List[str]:
             return simple_task_breakdown(task_description)
+        
+        def stream_task_steps(task_description: str, regenerate: bool = False) -> Iterator[str]:
+            yield from simple_task_breakdown(task_description)
 else:
-    def break_task(task_description: str) -> List[str]:
-        return simple_task_breakdown(task_description)
\ No newline at end of file
+    def break_task(task_description: str, regenerate: bool = False) -> List[str]:
+        return simple_task_breakdown(task_description)
+    
+    def stream_task_steps(task_description: str, regenerate: bool = False) -> Iterator[str]:
+        yield from simple_task_breakdown(task_description)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import re
+from typing import Callable, List
+from config import LLM_MODEL, MODEL_CONTEXT_TOKENS, DOCUMENT_SPLIT_OVERLAP, PACKING_RESERVE_TOKENS
+from backend.model_registry import get_tokenizer
+
+def token_counter(model_name: str = LLM_MODEL) -> Callable[[str], int]:
+    tokenizer = get_tokenizer(model_name)
+    return lambda text: len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+def prompt_budget(template_prompt: str, model_name: str = LLM_MODEL) -> int:
+    """Tokens left for documents once the rendered template and the reserve are accounted for."""
+    count = token_counter(model_name)
+    return MODEL_CONTEXT_TOKENS - count(template_prompt) - PACKING_RESERVE_TOKENS
+
+def strip_overlap(previous: str, current: str, max_words: int = 2 * DOCUMENT_SPLIT_OVERLAP) -> str:
+    """Drops the words ``current`` repeats from the end of ``previous``."""
+    previous_words = previous.split()
+    current_words = current.split()
+    for size in range(min(max_words, len(previous_words), len(current_words)), 0, -1):
+        if previous_words[-size:] == current_words[:size]:
+            return " ".join(current_words[size:])
+    return current
+
+def _split_to_budget(text: str, budget: int, count: Callable[[str], int]) -> List[str]:
+    pieces = []
+    current = []
+    used = 0
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        tokens = count(sentence)
+        if current and used + tokens > budget:
+            pieces.append(" ".join(current))
+            current = []
+            used = 0
+        # A single sentence longer than the budget is left for the tokenizer to truncate
+        current.append(sentence)
+        used += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def fit_chunks(chunks: List[str], budget: int, model_name: str = LLM_MODEL) -> List[str]:
+    """Splits the chunks longer than ``budget`` tokens by sentence; the others are kept as they are."""
+    count = token_counter(model_name)
+    fitted = []
+    for chunk in chunks:
+        if count(chunk) <= budget:
+            fitted.append(chunk)
+        else:
+            fitted.extend(_split_to_budget(chunk, budget, count))
+    return fitted
+
+def pack_chunks(chunks: List[str], budget: int, model_name: str = LLM_MODEL) -> List[str]:
+    """Packs consecutive chunks into as few texts of at most ``budget`` tokens as possible.
+
+    When a chunk joins the same pack as its predecessor, the overlap the
+    splitter copied between them is removed so it is not encoded twice.
+    Chunks that are larger than the budget on their own are split by sentence.
+    """
+    count = token_counter(model_name)
+    packs: List[List[str]] = []
+    used = 0
+    previous = None
+    for chunk in chunks:
+        if not chunk.strip():
+            continue
+        if packs and previous is not None:
+            stripped = strip_overlap(previous, chunk)
+            tokens = count(stripped)
+            if used + tokens <= budget:
+                packs[-1].append(stripped)
+                used += tokens
+                previous = chunk
+                continue
+        for piece in _split_to_budget(chunk, budget, count):
+            packs.append([piece])
+            used = count(piece)
+        previous = chunk
+    return [" ".join(pack) for pack in packs]
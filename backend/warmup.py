@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Dict, List
+from config import (
+    WARMUP_ENABLED, WARMUP_INPUT_WORDS, WARMUP_RETRY_SECONDS, SUMMARY_INFERENCE_BACKEND, QUIZ_INFERENCE_BACKEND,
+    TASK_INFERENCE_BACKEND, CHAT_INFERENCE_BACKEND, SUMMARY_MODEL, QUIZ_MODEL, TASK_MODEL, CHAT_MODEL,
+    MODEL_ROUTING_ENABLED, ROUTING_SMALL_MODEL
+)
+
+FEATURE_MODELS = [
+    (SUMMARY_MODEL, SUMMARY_INFERENCE_BACKEND),
+    (QUIZ_MODEL, QUIZ_INFERENCE_BACKEND),
+    (TASK_MODEL, TASK_INFERENCE_BACKEND),
+    (CHAT_MODEL, CHAT_INFERENCE_BACKEND),
+]
+
+def local_models() -> List[str]:
+    """Distinct models served in-process, including the router's small model."""
+    names = [model_name for model_name, backend in FEATURE_MODELS if backend == "local"]
+    if names and MODEL_ROUTING_ENABLED:
+        names.insert(0, ROUTING_SMALL_MODEL)
+    return list(dict.fromkeys(names))
+
+WARMUP_TEXT = (
+    "TaskTamer breaks complex tasks into steps, summarizes documents and writes quizzes "
+    "so that students can study and plan their work with less effort. "
+)
+
+_state = {"status": "not started", "detail": "", "seconds": 0.0}
+_state_lock = threading.Lock()
+_thread = None
+_failures = 0
+_retry_at = 0.0
+MAX_RETRY_SECONDS = 1800
+
+def _set(status: str, detail: str = "", seconds: float = 0.0) -> None:
+    with _state_lock:
+        _state.update(status=status, detail=detail, seconds=round(seconds, 2))
+
+def _warmup_prompts() -> List[str]:
+    words = WARMUP_TEXT.split()
+    prompts = []
+    for length in WARMUP_INPUT_WORDS:
+        text = " ".join(words[i % len(words)] for i in range(length))
+        prompts.append(f"Summarize the following document: {text}")
+    return prompts
+
+def warm_model(model_name: str) -> None:
+    """Loads a model in this process and runs it once per warmup input length."""
+    from backend.generation import generate
+    from backend.model_registry import get_pipeline
+
+    get_pipeline(model_name)
+    # One pass per input length so the allocator and kernels see
+    # the shapes real requests will use.
+    for prompt in _warmup_prompts():
+        generate([prompt], model_name=model_name, max_new_tokens=16)
+
+def _run(model_names: List[str]) -> None:
+    global _failures, _retry_at
+    from backend.inference_workers import supervisor, use_workers
+
+    started = time.perf_counter()
+    try:
+        if use_workers():
+            # The worker process loads and warms the models before reporting ready
+            _set("starting worker", ", ".join(model_names), time.perf_counter() - started)
+            supervisor.start(model_names)
+        else:
+            for model_name in model_names:
+                _set("warming up", model_name, time.perf_counter() - started)
+                warm_model(model_name)
+        _set("ready", ", ".join(model_names), time.perf_counter() - started)
+    except Exception as e:
+        with _state_lock:
+            _failures += 1
+            delay = min(WARMUP_RETRY_SECONDS * 2 ** (_failures - 1), MAX_RETRY_SECONDS)
+            _retry_at = time.monotonic() + delay
+        _set("failed", f"{e} (retrying in {delay:.0f}s)", time.perf_counter() - started)
+
+def start_warmup(model_names: List[str] = None) -> None:
+    """Loads and warms the models in the background once per process.
+
+    After a failure, the next call once the backoff has passed starts over.
+    """
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+    with _state_lock:
+        if _thread is not None and (_state["status"] != "failed" or time.monotonic() < _retry_at):
+            return
+        if model_names is None:
+            model_names = local_models()
+        _thread = threading.Thread(target=_run, args=(model_names,), name="model-warmup", daemon=True)
+        _state["status"] = "starting"
+    _thread.start()
+
+def is_ready() -> bool:
+    """True once warmup finished; requests before that use the simple_* fallbacks."""
+    if not WARMUP_ENABLED:
+        return True
+    with _state_lock:
+        # Nothing to wait for if warmup was never started in this process
+        return _state["status"] in ("ready", "not started")
+
+def warmup_status() -> Dict[str, str]:
+    with _state_lock:
+        return dict(_state)
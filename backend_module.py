@@ -73,40 +73,21 @@ def fetch_webpage_content(url: str) -> str:
     except requests.RequestException as e:
         return f"Error fetching webpage: {e}"
 
-import os
-
 def process_documents(files_or_urls: List[str]):
-    """Processes multiple document types including web pages."""
+    """Processes multiple document types including web pages.
+
+    The staged fetch, convert and write pipeline lives in backend.ingestion,
+    which can be imported and spawned without this notebook's shell lines
+    and model setup. Returns per-stage throughput.
+    """
     if not files_or_urls:
         return "No document or URL provided. Please upload a document or enter a webpage URL."
 
-    for item in files_or_urls:
-        if item.startswith("http"):
-            raw_text = fetch_webpage_content(item)
-        elif os.path.exists(item):  # Check if file exists before processing
-            if item.endswith(".pdf"):
-                converter = PDFToTextConverter()
-                raw_text = converter.convert(file_path=item)
-                if isinstance(raw_text, list) and raw_text:
-                    raw_text = raw_text[0].content  # Extract text from Document object
-                else:
-                    raw_text = ""
-            else:
-                converter = TextConverter()
-                raw_text = converter.convert(file_path=item)
-                if isinstance(raw_text, list) and raw_text:
-                    raw_text = raw_text[0].content
-                else:
-                    raw_text = ""
-        else:
-            print(f"Warning: File '{item}' not found. Skipping.")
-            continue  # Skip to the next file
-
-        if raw_text:
-            processed_docs = preprocessor.process([{"content": raw_text}])
-            document_store.write_documents(processed_docs)
-        else:
-            print(f"Warning: No text extracted from {item}")
+    from backend.ingestion import ingest_documents
+    stats = ingest_documents(files_or_urls, document_store)
+    for name, stage in stats.items():
+        print(f"{name}: {stage['items']} items, {stage['items_per_second']}/s")
+    return stats
 
 # Summarization Function
 def summarize_documents():
@@ -141,8 +122,8 @@ if __name__ == "__main__":
     print("Summary:", summarize_documents())
     print("Generated Questions:", generate_questions())
 
-test_url = "https://en.wikipedia.org/wiki/Artificial_intelligence"  # Example webpage
-process_documents([test_url])
+    test_url = "https://en.wikipedia.org/wiki/Artificial_intelligence"  # Example webpage
+    process_documents([test_url])
 
-print("Summary:", summarize_documents())
-print("Generated Questions:", generate_questions())
+    print("Summary:", summarize_documents())
+    print("Generated Questions:", generate_questions())
@@ -0,0 +1,68 @@
+"""Import-time budget for the Home page first paint.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py
+
+Imports ``streamlit_app`` and the Home page under ``python -X importtime`` and
+exits non-zero if any heavy NLP package is imported or if the modules the
+app adds on top of a bare ``import streamlit`` exceed IMPORT_BUDGET_MS.
+tests/test_import_time.py enforces the same budget in the test suite.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 300
+FORBIDDEN_PACKAGES = ("torch", "transformers", "haystack", "sklearn", "googleapiclient")
+
+def run_importtime(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Import failed:\n{result.stderr}")
+    return result.stderr.splitlines()
+
+def parse(lines):
+    # Lines look like: "import time:      1234 |       5678 |   package.module"
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append((name, int(self_us)))
+    return modules
+
+def measure():
+    """Returns the heavy packages imported, the app's own import time in µs and its added modules."""
+    baseline = {name for name, _ in parse(run_importtime("import streamlit"))}
+    modules = parse(run_importtime("import streamlit_app; streamlit_app.load_page('Home')"))
+    added = [(name, self_us) for name, self_us in modules if name not in baseline]
+
+    heavy = sorted({name.split(".")[0] for name, _ in modules if name.split(".")[0] in FORBIDDEN_PACKAGES})
+    own_us = sum(self_us for _, self_us in added)
+    return heavy, own_us, added
+
+def main():
+    heavy, own_us, added = measure()
+    slowest = sorted(added, key=lambda m: m[1], reverse=True)[:10]
+
+    print(f"Modules added on top of streamlit: {len(added)}")
+    print(f"Import time: {own_us / 1000:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    for name, self_us in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if heavy:
+        failures.append(f"heavy packages imported at startup: {', '.join(heavy)}")
+    if own_us / 1000 > IMPORT_BUDGET_MS:
+        failures.append("import time budget exceeded")
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+if __name__ == "__main__":
+    main()
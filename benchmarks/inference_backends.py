@@ -0,0 +1,72 @@
+"""Compares latency and memory of the configured inference backends.
+
+Run from the repository root:
+
+    python benchmarks/inference_backends.py [pytorch pytorch_int8 onnx]
+
+Each backend runs in its own subprocess so max RSS reflects only that backend.
+"""
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+BACKENDS = ["pytorch", "pytorch_int8", "onnx"]
+RUNS = 5
+PROMPTS = [
+    "Break the following task into smaller steps: Write a research paper on AI ethics",
+    "Summarize the following document: " + " ".join(
+        ["Photosynthesis converts light energy into chemical energy stored in glucose."] * 30
+    ),
+]
+
+def measure(backend: str) -> dict:
+    from config import LLM_MODEL
+    from backend.model_registry import get_pipeline
+
+    started = time.perf_counter()
+    pipe = get_pipeline(LLM_MODEL, backend=backend)
+    load_seconds = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(RUNS):
+        for prompt in PROMPTS:
+            started = time.perf_counter()
+            pipe(prompt, max_new_tokens=64)
+            latencies.append(time.perf_counter() - started)
+
+    return {
+        "backend": backend,
+        "load_s": round(load_seconds, 2),
+        "p50_ms": round(1000 * statistics.median(latencies), 1),
+        "max_ms": round(1000 * max(latencies), 1),
+        # ru_maxrss is reported in kilobytes on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    backends = sys.argv[1:] or BACKENDS
+    print(f"{'backend':<14}{'load s':>8}{'p50 ms':>10}{'max ms':>10}{'max RSS MB':>12}")
+    for backend in backends:
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", backend],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"{backend:<14}failed: {result.stderr.strip().splitlines()[-1] if result.stderr else 'unknown error'}")
+            continue
+        row = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{backend:<14}{row['load_s']:>8}{row['p50_ms']:>10}{row['max_ms']:>10}{row['max_rss_mb']:>12}")
+
+if __name__ == "__main__":
+    main()
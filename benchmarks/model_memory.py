@@ -0,0 +1,48 @@
+"""Measures resident memory as each backend module makes its first model call.
+
+Run from the repository root:
+
+    python benchmarks/model_memory.py
+
+With the shared model registry the first call loads the model and later
+modules add almost nothing, so the registry reports a single loaded model.
+Inference workers are turned off so the models load in this process, where
+they can be measured.
+"""
+import os
+import resource
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    from backend import inference_workers, model_registry
+    inference_workers.INFERENCE_WORKERS_ENABLED = False
+    from backend.summarization import summarize_content
+    from backend.quiz_generator import generate_quiz
+    from backend.task_manager import break_task
+
+    text = (
+        "The mitochondria is the powerhouse of the cell. It produces energy through respiration. "
+        "Cells with high energy demands contain many mitochondria."
+    )
+    calls = [
+        ("summarization", lambda: summarize_content(content=text)),
+        ("quiz_generator", lambda: generate_quiz(content=text, num_questions=1)),
+        ("task_manager", lambda: break_task("Write a research paper on AI ethics")),
+    ]
+
+    print(f"{'stage':<16}{'max RSS (MB)':>14}{'models':>8}")
+    print(f"{'imports':<16}{rss_mb():>14.1f}{len(model_registry.loaded_models()):>8}")
+    for name, call in calls:
+        call()
+        print(f"{name:<16}{rss_mb():>14.1f}{len(model_registry.loaded_models()):>8}")
+
+    print(f"Resident models: {model_registry.loaded_models()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compares fixed-size batches with length-bucketed, token-budgeted batches.
+
+Run from the repository root:
+
+    python benchmarks/padding_buckets.py [--generate] [files...]
+
+Documents (the given text files, or a synthetic set of articles of varied
+length) are split with the same PreProcessor settings the app uses and wrapped
+in the map-stage summary prompt. The report shows how many padded input tokens
+each strategy feeds the encoder; ``--generate`` also times both strategies on
+the configured model.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose.",
+    "The mitochondria produce most of the energy a cell needs through respiration.",
+    "Students remember more when they test themselves instead of rereading notes.",
+    "A good plan breaks a large assignment into steps that each fit in one sitting.",
+    "Short sentences help.",
+    "Spaced repetition schedules reviews just before a fact would otherwise be forgotten, "
+    "which keeps the total study time low while retention stays high.",
+]
+
+def synthetic_documents(count: int = 40, seed: int = 7):
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        # Article lengths are roughly log-normal: many short pages, a few long ones
+        words = int(min(6000, rng.lognormvariate(6.2, 0.9)))
+        text, length = [], 0
+        while length < words:
+            sentence = rng.choice(SENTENCES)
+            text.append(sentence)
+            length += len(sentence.split())
+        documents.append(" ".join(text))
+    return documents
+
+def chunk_prompts(documents):
+    from backend.core import split_text
+    return [
+        f"Summarize the following document: {chunk.content}"
+        for document in documents
+        for chunk in split_text(document)
+    ]
+
+def padded_tokens(lengths, batches):
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+
+def main():
+    from config import LLM_MODEL, GENERATION_BATCH_SIZE, GENERATION_TOKEN_BUDGET
+    from backend.generation import count_tokens, generate, plan_batches
+
+    args = sys.argv[1:]
+    run_generation = "--generate" in args
+    paths = [arg for arg in args if arg != "--generate"]
+    if paths:
+        documents = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                documents.append(f.read())
+    else:
+        documents = synthetic_documents()
+
+    prompts = chunk_prompts(documents)
+    lengths = [count_tokens(prompt) for prompt in prompts]
+    real = sum(lengths)
+    print(f"{len(documents)} documents, {len(prompts)} chunks, "
+          f"{min(lengths)}-{max(lengths)} tokens (mean {real / len(lengths):.0f})")
+
+    strategies = [
+        ("fixed", None),
+        ("bucketed", GENERATION_TOKEN_BUDGET),
+    ]
+    if run_generation:
+        # Load the model (and start the inference worker) before anything is timed
+        generate(prompts[:1], model_name=LLM_MODEL, max_new_tokens=1)
+    print(f"{'strategy':<10}{'batches':>9}{'padded tokens':>15}{'efficiency':>12}{'seconds':>10}")
+    for name, budget in strategies:
+        batches = plan_batches(lengths, GENERATION_BATCH_SIZE, budget)
+        padded = padded_tokens(lengths, batches)
+        seconds = ""
+        if run_generation:
+            started = time.perf_counter()
+            generate(prompts, model_name=LLM_MODEL, max_new_tokens=32, token_budget=budget)
+            seconds = f"{time.perf_counter() - started:.1f}"
+        print(f"{name:<10}{len(batches):>9}{padded:>15}{real / padded:>12.1%}{seconds:>10}")
+
+if __name__ == "__main__":
+    main()
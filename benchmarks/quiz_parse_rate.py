@@ -0,0 +1,82 @@
+"""Reports how often quiz generations fail to parse, with and without the schema constraint.
+
+Run from the repository root:
+
+    python benchmarks/quiz_parse_rate.py [num_questions]
+
+"unconstrained" is the JSON prompt parsed the way generate_quiz used to:
+json.loads, then parse_non_json_quiz_format. A generation counts as failed when
+neither yields a question with four options and an answer among them.
+"constrained" decodes under the quiz schema and parses with parse_quiz_text.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSAGES = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose. It takes place in the "
+    "chloroplasts of plant cells and releases oxygen as a by-product.",
+    "The mitochondria produce most of the energy a cell needs through cellular respiration. Cells with high "
+    "energy demands, such as muscle cells, contain many mitochondria.",
+    "The French Revolution began in 1789 with the storming of the Bastille. It ended the absolute monarchy "
+    "and led to the rise of Napoleon Bonaparte.",
+    "Water boils at 100 degrees Celsius at sea level. At higher altitudes the air pressure is lower, so "
+    "water boils at a lower temperature.",
+    "Spaced repetition schedules reviews just before a fact would be forgotten. Testing yourself is more "
+    "effective than rereading notes.",
+    "The Pacific is the largest and deepest ocean on Earth. The Mariana Trench, its deepest point, is almost "
+    "11 kilometres deep.",
+]
+
+def well_formed(questions) -> bool:
+    return isinstance(questions, list) and any(
+        isinstance(q, dict) and len(q.get("options", [])) == 4 and q.get("answer") in q["options"]
+        for q in questions
+    )
+
+def parse_unconstrained(text: str):
+    from backend.quiz_generator import parse_non_json_quiz_format
+    raw = text if "[" in text else f"[{text}]"
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return parse_non_json_quiz_format(text)
+
+def main():
+    from config import QUIZ_MODEL, QUIZ_MAX_NEW_TOKENS
+    from backend.generation import generate
+    from backend.constrained_decoding import QUIZ_FORMAT, parse_quiz_text, question_token_budget
+
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    intro = (f"Generate {num_questions} multiple-choice questions with one correct answer and three "
+             "incorrect alternatives from the following text. ")
+    runs = [
+        ("unconstrained",
+         intro + "Format your response as a JSON array with 'question', 'options' (array of 4 strings), "
+                 "and 'answer' (the correct option string) for each question: {passage}",
+         QUIZ_MAX_NEW_TOKENS, None, parse_unconstrained),
+        ("constrained",
+         intro + "Write each question as: " + QUIZ_FORMAT + ". Text: {passage}",
+         num_questions * question_token_budget(), "quiz", parse_quiz_text),
+    ]
+
+    print(f"{'mode':<15}{'failures':>10}{'fail rate':>11}{'questions':>11}{'seconds':>10}")
+    for name, template, max_new_tokens, schema, parse in runs:
+        prompts = [template.format(passage=passage) for passage in PASSAGES]
+        # Untimed warm-up, so the first mode does not pay for loading the model or schema
+        generate(prompts[:1], model_name=QUIZ_MODEL, max_new_tokens=8, schema=schema,
+                 max_items=num_questions if schema else None)
+        started = time.perf_counter()
+        outputs = generate(prompts, model_name=QUIZ_MODEL, max_new_tokens=max_new_tokens, schema=schema,
+                           max_items=num_questions if schema else None)
+        seconds = time.perf_counter() - started
+        parsed = [parse(output) for output in outputs]
+        failures = sum(not well_formed(questions) for questions in parsed)
+        count = sum(len(questions) for questions in parsed if well_formed(questions))
+        print(f"{name:<15}{failures:>10}{failures / len(prompts):>11.0%}{count:>11}{seconds:>10.1f}")
+
+if __name__ == "__main__":
+    main()
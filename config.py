@@ -1,4 +1,75 @@
 LLM_MODEL = "google/flan-t5-large"
 DOCUMENT_SPLIT_LENGTH = 200
 DOCUMENT_SPLIT_OVERLAP = 50
-MAX_QUIZ_QUESTIONS = 5
\ No newline at end of file
+INGEST_FETCH_WORKERS = 8
+INGEST_CONVERT_WORKERS = 0  # converter processes, 0 for one fewer than the CPU count
+INGEST_QUEUE_SIZE = 64
+INGEST_WRITE_BATCH_SIZE = 256
+MAX_QUIZ_QUESTIONS = 5
+PROCESS_POOL_SIZE = 2
+PROCESS_POOL_INLINE_THRESHOLD = 20000
+SUMMARY_CHUNK_CACHE_SIZE = 5000
+MODEL_CONTEXT_TOKENS = 512
+GENERATION_BATCH_SIZE = 8
+SUMMARY_MODE = "map_reduce"
+SUMMARY_BATCH_SIZE = 8
+SUMMARY_REDUCE_FANOUT = 4
+SUMMARY_MAX_NEW_TOKENS = 128
+INFERENCE_SCHEDULER_ENABLED = True
+INFERENCE_MAX_BATCH_SIZE = 8
+INFERENCE_MAX_WAIT_MS = 20
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_PATH = ".cache/results.sqlite3"
+RESULT_CACHE_MEMORY_ENTRIES = 1024
+RESULT_CACHE_DISK_ENTRIES = 50000
+PACKING_RESERVE_TOKENS = 8
+INFERENCE_BACKEND = "pytorch"  # "pytorch", "pytorch_int8" or "onnx"
+ONNX_MODEL_DIR = ".cache/onnx"
+MODEL_ARTIFACT_DIR = "models"
+OFFLINE_MODE = False
+WARMUP_ENABLED = True
+WARMUP_INPUT_WORDS = [16, 128, 384]
+WARMUP_RETRY_SECONDS = 30  # first retry delay after a failed warmup, doubled per failure up to 30 minutes
+SUMMARY_INFERENCE_BACKEND = "local"  # "local" or "server"
+QUIZ_INFERENCE_BACKEND = "local"
+TASK_INFERENCE_BACKEND = "local"
+CHAT_INFERENCE_BACKEND = "local"
+INFERENCE_SERVER_URL = "http://localhost:8080"
+INFERENCE_SERVER_MODEL = "google/flan-t5-large"
+INFERENCE_SERVER_TIMEOUT = 60
+INFERENCE_SERVER_RETRIES = 3
+INFERENCE_SERVER_MAX_CONCURRENCY = 16
+INFERENCE_SERVER_TARGET_LATENCY_MS = 5000
+JOB_DB_PATH = ".cache/jobs.sqlite3"
+JOB_WORKERS = 2
+JOB_POLL_SECONDS = 0.5
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+SUMMARY_LATENCY_SLO_MS = 20000
+QUIZ_LATENCY_SLO_MS = 15000
+TASK_LATENCY_SLO_MS = 8000
+BREAKER_MAX_ERROR_RATE = 0.5
+BREAKER_WINDOW_SECONDS = 120
+BREAKER_MIN_SAMPLES = 5
+BREAKER_OPEN_SECONDS = 30
+BREAKER_MAX_QUEUE_DEPTH = 32
+SUMMARY_MODEL = LLM_MODEL
+QUIZ_MODEL = LLM_MODEL
+TASK_MODEL = "google/flan-t5-base"
+CHAT_MODEL = LLM_MODEL
+QUIZ_MAX_NEW_TOKENS = 256
+TASK_MAX_NEW_TOKENS = 128
+CHAT_MAX_NEW_TOKENS = 96
+MODEL_ROUTING_ENABLED = False
+ROUTING_SMALL_MODEL = "google/flan-t5-small"
+ROUTING_THRESHOLD_TOKENS = 96
+GENERATION_TOKEN_BUDGET = 4096
+QUIZ_CONSTRAINED_DECODING = True
+QUIZ_MAX_TOKENS_PER_QUESTION = 160  # a 240-char question and four 100-char options at ~4 chars per token
+INFERENCE_PRIORITY_MODE = "strict"  # "strict" or "weighted"
+INFERENCE_PRIORITY_WEIGHTS = {"interactive": 8, "bulk": 1}
+INFERENCE_CLASS_LIMITS = {"interactive": 0, "bulk": 64}  # queued + running requests, 0 for no limit
+INFERENCE_WORKERS_ENABLED = True
+INFERENCE_WORKER_MAX_REQUESTS = 500
+INFERENCE_WORKER_MAX_RSS_MB = 6144
+INFERENCE_WORKER_START_TIMEOUT = 600
+INFERENCE_WORKER_REQUEST_TIMEOUT = 300  # seconds without a reply before a worker is replaced, 0 to wait forever
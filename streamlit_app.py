@@ -2,13 +2,18 @@ import streamlit as st
 import importlib
 import sys
 import os
+import uuid
 
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
 try:
-    from utils.fallback_detector import USING_FALLBACK, check_dependencies
+    from utils.fallback_detector import USING_FALLBACK, HAYSTACK_AVAILABLE, check_dependencies
+    from backend.warmup import start_warmup, warmup_status
+    from utils.cancellation import (
+        Cancelled, begin_script_run, end_script_run, cancellation_scope, cancellation_metrics
+    )
     
   
     def load_module(module_name):
@@ -19,22 +24,23 @@ try:
             return None
 
     
-    home_page = load_module('ui.pages.home_page')
-    task_page = load_module('ui.pages.task_page')
-    summary_page = load_module('ui.pages.summary_page')
-    quiz_page = load_module('ui.pages.quiz_page')
-    about_page = load_module('ui.pages.about_page')
     styles = load_module('ui.styles')
 
-    
+    # Pages (and the backends they import) are loaded on first navigation,
+    # so the Home page renders without waiting on the NLP stack.
     PAGES = {
-        "Home": home_page.render_home_page if home_page else None,
-        "Task Breakdown": task_page.render_task_page if task_page else None,
-        "Summarization": summary_page.render_summary_page if summary_page else None,
-        "Quiz Generator": quiz_page.render_quiz_page if quiz_page else None,
-        "About": about_page.render_about_page if about_page else None
+        "Home": ("ui.pages.home_page", "render_home_page"),
+        "Task Breakdown": ("ui.pages.task_page", "render_task_page"),
+        "Summarization": ("ui.pages.summary_page", "render_summary_page"),
+        "Quiz Generator": ("ui.pages.quiz_page", "render_quiz_page"),
+        "About": ("ui.pages.about_page", "render_about_page")
     }
 
+    def load_page(name):
+        module_name, function_name = PAGES[name]
+        module = load_module(module_name)
+        return getattr(module, function_name, None) if module else None
+
 
     APP_TITLE = "TaskTamer"
     APP_DESCRIPTION = (
@@ -50,6 +56,15 @@ try:
             st.session_state.task_data = {}
             st.session_state.quiz_history = []
             st.session_state.chat_history = []
+            st.session_state.session_id = uuid.uuid4().hex
+
+    def leave_page(selection):
+        """Cancels the previous page's unfinished jobs when the user navigates away."""
+        previous = st.session_state.get("active_page")
+        st.session_state.active_page = selection
+        if previous is not None and previous != selection and st.session_state.get("job_keys"):
+            from ui.components.jobs import cancel_session_jobs
+            cancel_session_jobs()
 
     def main():
         """Main function to run the Streamlit app."""
@@ -60,6 +75,8 @@ try:
             
             
             initialize_session_state()
+            if HAYSTACK_AVAILABLE:
+                start_warmup()
             
           
             if USING_FALLBACK:
@@ -67,17 +84,28 @@ try:
             
           
             st.sidebar.title(APP_TITLE)
-            valid_pages = {k: v for k, v in PAGES.items() if v is not None}
-            selection = st.sidebar.radio("Navigate", list(valid_pages.keys()), index=0)
+            selection = st.sidebar.radio("Navigate", list(PAGES.keys()), index=0)
+            leave_page(selection)
             
           
             st.info(f"{APP_DESCRIPTION}\n\nMade with ❤️ by {DEVELOPER_NAME}")
             st.markdown("---")
             
             
-            page_function = valid_pages.get(selection)
+            page_function = load_page(selection)
             if page_function:
-                page_function()
+                # Work started by this run is cancelled if a rerun or stop interrupts it
+                run_token = begin_script_run(st.session_state.session_id)
+                completed = False
+                try:
+                    with cancellation_scope(run_token):
+                        page_function()
+                    completed = True
+                except Cancelled:
+                    # Superseded by a newer run of this session, which renders the page
+                    pass
+                finally:
+                    end_script_run(st.session_state.session_id, run_token, completed)
             else:
                 st.error("Page not found. Please select a valid page.")
                 
@@ -88,6 +116,52 @@ try:
                 for dep, available in deps.items():
                     st.write(f"- {dep}: {'✅' if available else '❌'}")
                 
+                if HAYSTACK_AVAILABLE:
+                    warmup = warmup_status()
+                    if warmup["status"] == "ready":
+                        st.write(f"Models: ✅ ready ({warmup['seconds']}s)")
+                    else:
+                        st.write(f"Models: ⏳ {warmup['status']} {warmup['detail']} - using simplified results until ready")
+                    
+                    from backend.model_router import router
+                    for feature, counts in router.metrics().items():
+                        st.write(f"Routing ({feature}): " + ", ".join(f"{name} {count}" for name, count in counts.items()))
+                    
+                    from config import INFERENCE_SCHEDULER_ENABLED
+                    if INFERENCE_SCHEDULER_ENABLED:
+                        from backend.inference_scheduler import scheduler
+                        batching = scheduler.metrics()
+                        st.write(
+                            f"Scheduler: {batching['batches']} batches, avg size {batching['avg_batch_size']}, "
+                            f"queued {batching['interactive_queue_depth']} interactive / "
+                            f"{batching['bulk_queue_depth']} bulk, p95 wait {batching['interactive_p95_wait_ms']} ms "
+                            f"interactive / {batching['bulk_p95_wait_ms']} ms bulk, preempted {batching['preempted']}"
+                        )
+                    
+                    from config import RESULT_CACHE_ENABLED
+                    if RESULT_CACHE_ENABLED:
+                        from backend.result_cache import result_cache
+                        cached = result_cache.metrics()
+                        st.write(
+                            f"Result cache: hit rate {cached['hit_rate']:.0%} "
+                            f"({cached['memory_hits']} memory / {cached['disk_hits']} disk hits, "
+                            f"{cached['misses']} misses)"
+                        )
+                    
+                    from backend.inference_workers import supervisor, use_workers
+                    worker = supervisor.metrics()
+                    if use_workers() and worker["pid"]:
+                        st.write(
+                            f"Inference worker: pid {worker['pid']}, {worker['rss_mb']} MB, "
+                            f"{worker['served']} requests, recycled {worker['recycled']}x, crashed {worker['crashed']}x, "
+                            f"timed out {worker['timed_out']}x"
+                        )
+                
+                cancelled = cancellation_metrics()
+                if cancelled["superseded_runs"] or cancelled["abandoned"]:
+                    abandoned = ", ".join(f"{stage} {count}" for stage, count in cancelled["abandoned"].items())
+                    st.write(f"Cancelled: {cancelled['superseded_runs']} superseded runs ({abandoned or 'no work lost'})")
+                
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             st.write("Please try again or contact support.")
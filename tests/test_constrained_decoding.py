@@ -0,0 +1,60 @@
+import pytest
+
+from backend.constrained_decoding import (
+    CLOSING_TOKENS, FIELD_START_CHARS, QuizSchemaMachine, SchemaLogitsProcessor, parse_quiz_text
+)
+
+VOCABULARY = ["<pad>", "</s>", "▁Question", ":", "▁word", "?", "▁(", "A", "B", "C", "D", ")", "Answer", "n", "s", "w", "e", "r"]
+# A model that would rather keep writing than close anything
+PREFERENCE = {"▁word": 10.0, "▁Question": 5.0, "</s>": 0.0}
+
+class Tokenizer:
+    pad_token_id = 0
+    eos_token_id = 1
+    all_special_ids = [0, 1]
+
+    def __len__(self):
+        return len(VOCABULARY)
+
+    def convert_ids_to_tokens(self, ids):
+        return [VOCABULARY[i] for i in ids]
+
+def test_empty_field_is_opened_not_closed():
+    machine = QuizSchemaMachine()
+    assert machine.feed("Question: Why? (A)")
+    assert machine.next_chars() == FIELD_START_CHARS
+    assert not machine.copy().feed("(")
+
+def test_forced_completion_closes_within_budget():
+    # The path the processor forces once a question is past its cap, one character per token
+    machine = QuizSchemaMachine()
+    text = "Question: Why"
+    assert machine.feed(text)
+    forced = 0
+    while not machine.can_end():
+        char = machine.next_chars()[0]
+        assert machine.feed(char)
+        text += char
+        forced += 1
+    assert forced <= CLOSING_TOKENS
+    questions = parse_quiz_text(text)
+    assert len(questions) == 1
+    assert len(questions[0]["options"]) == 4
+
+def test_questions_past_token_cap_still_parse(monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.setattr(QuizSchemaMachine, "item_token_limit", 4)
+    processor = SchemaLogitsProcessor("quiz", Tokenizer(), max_items=2)
+    base = torch.tensor([PREFERENCE.get(piece, 1.0) for piece in VOCABULARY])
+
+    tokens = []
+    while Tokenizer.eos_token_id not in tokens and len(tokens) < 200:
+        input_ids = torch.tensor([[Tokenizer.pad_token_id] + tokens])
+        scores = processor(input_ids, base.clone()[None, :])
+        tokens.append(int(scores[0].argmax()))
+
+    assert tokens[-1] == Tokenizer.eos_token_id
+    text = "".join(VOCABULARY[token] for token in tokens[:-1]).replace("▁", " ")
+    questions = parse_quiz_text(text)
+    assert len(questions) == 2
+    assert all(len(question["options"]) == 4 for question in questions)
@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+from benchmarks.import_time import IMPORT_BUDGET_MS, measure
+
+def test_home_page_imports_within_budget():
+    heavy, own_us, added = measure()
+    assert not heavy, f"heavy packages imported at startup: {', '.join(heavy)}"
+    slowest = sorted(added, key=lambda module: module[1], reverse=True)[:5]
+    assert own_us / 1000 <= IMPORT_BUDGET_MS, f"{own_us / 1000:.1f} ms, slowest: {slowest}"
@@ -0,0 +1,38 @@
+import sys
+import types
+
+from backend.inference_scheduler import InferenceScheduler
+
+def stub_generate(monkeypatch, calls):
+    def generate(prompts, **kwargs):
+        calls.append(list(prompts))
+        return prompts
+    module = types.ModuleType("backend.generation")
+    module.generate = generate
+    monkeypatch.setitem(sys.modules, "backend.generation", module)
+
+def test_weighted_mixed_queue_serves_both_classes(monkeypatch):
+    calls = []
+    stub_generate(monkeypatch, calls)
+    scheduler = InferenceScheduler(max_batch_size=8, max_wait_ms=1, mode="weighted",
+                                   weights={"interactive": 8, "bulk": 1}, limits={})
+    scheduler.served["interactive"] = 8
+    start_worker = scheduler._ensure_worker
+    monkeypatch.setattr(scheduler, "_ensure_worker", lambda: None)
+    futures = [scheduler.submit(f"bulk {i}", priority="bulk") for i in range(4)]
+    futures += [scheduler.submit(f"interactive {i}", priority="interactive") for i in range(4)]
+    start_worker()
+
+    assert [future.result(timeout=5) for future in futures] == [f"bulk {i}" for i in range(4)] + [
+        f"interactive {i}" for i in range(4)
+    ]
+    # Bulk was owed a batch, so it is not preempted back into the queue forever
+    assert calls[0] == [f"bulk {i}" for i in range(4)]
+    assert scheduler.preempted == 0
+
+def test_class_returning_from_idle_does_not_take_every_batch():
+    scheduler = InferenceScheduler(mode="weighted", weights={"interactive": 8, "bulk": 1}, limits={})
+    scheduler.served = {"interactive": 0, "bulk": 10000}
+    scheduler.queues["bulk"].append(object())
+    scheduler._catch_up("interactive")
+    assert scheduler.served["interactive"] == 80000
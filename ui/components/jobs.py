@@ -0,0 +1,88 @@
+import time
+import streamlit as st
+from backend.jobs import job_queue
+from config import JOB_POLL_SECONDS
+
+def submit_job(session_key, feature, preview=None, **params):
+    """Queues a job for this session and stores an instant preview result if one is given.
+
+    ``preview`` runs in the script, so it may only use data the page already
+    has, such as pasted text. Jobs for a URL publish their own preview once
+    the page is fetched.
+    """
+    previous = st.session_state.get(session_key)
+    st.session_state[session_key] = job_queue.submit(feature, params)
+    # Submitting again (e.g. after editing the input) supersedes the previous job
+    if previous:
+        job_queue.release(previous)
+    keys = st.session_state.setdefault("job_keys", [])
+    if session_key not in keys:
+        keys.append(session_key)
+    st.session_state[f"{session_key}_preview"] = preview() if preview else None
+
+def regenerate_button(session_key, job):
+    """Offers to run a finished job again without the result cache, e.g. after a poor result."""
+    st.button(
+        "Regenerate",
+        key=f"{session_key}_regenerate",
+        help="Generate a new result instead of reusing the saved one",
+        on_click=submit_job,
+        args=(session_key, job["feature"]),
+        kwargs=dict(job["params"], regenerate=True)
+    )
+
+def cancel_session_jobs():
+    """Releases this session's unfinished jobs, cancelling those nobody else wants.
+
+    Finished jobs keep their session keys, so their results are still shown
+    when the user comes back to the page.
+    """
+    for session_key in st.session_state.get("job_keys", []):
+        job_id = st.session_state.get(session_key)
+        if not job_id:
+            continue
+        job = job_queue.get(job_id)
+        if job is None or job["status"] in ("queued", "running"):
+            del st.session_state[session_key]
+            job_queue.release(job_id)
+
+def get_job(session_key):
+    job_id = st.session_state.get(session_key)
+    if not job_id:
+        return None
+    
+    job = job_queue.get(job_id)
+    if job is None or job["status"] == "cancelled":
+        del st.session_state[session_key]
+        return None
+    return job
+
+def follow_job(session_key, render_partial=None, message="Working..."):
+    """Shows a job's progress in one result slot and returns the job once it has finished.
+
+    The slot first shows the preview, then any partial model output, and is
+    updated in place without rerunning the page. ``render_partial`` must not
+    create widgets, since it is called repeatedly in the same script run.
+    """
+    job = get_job(session_key)
+    if job is None:
+        return None
+    
+    slot = st.empty()
+    while job and job["status"] in ("queued", "running"):
+        preview = st.session_state.get(f"{session_key}_preview") or job["preview"]
+        with slot.container():
+            if job["partial"] and render_partial:
+                render_partial(job["partial"])
+            elif preview and render_partial:
+                render_partial(preview)
+                st.caption("Quick preview. The AI result will replace it as soon as it is ready.")
+            else:
+                st.info(message)
+        time.sleep(JOB_POLL_SECONDS)
+        job = get_job(session_key)
+    slot.empty()
+    
+    if job and job.get("degraded"):
+        st.info("The AI model is busy right now, so this is a simplified result. Try again shortly for a full one.")
+    return job
@@ -1,5 +1,5 @@
 import streamlit as st
-from backend.chat_assistant import ask_question
+from backend.chat_assistant import stream_answer
 from ui.styles import section_header, warning_box
 
 def render_chat_component():
@@ -24,8 +24,8 @@ def render_chat_component():
             warning_box("Please enter a question")
             return
             
-        with st.spinner("Generating answer..."):
-            answer = ask_question(question)
+        st.write(f"You: {question}")
+        answer = st.write_stream(stream_answer(question))
             
         st.session_state.chat_history.append({"role": "user", "content": question})
         st.session_state.chat_history.append({"role": "assistant", "content": answer})
@@ -1,6 +1,7 @@
 import streamlit as st
-from backend.quiz_generator import generate_quiz
 from ui.styles import main_header, section_header, warning_box, success_box
+from ui.components.jobs import submit_job, follow_job, regenerate_button
+from backend.quiz_generator import preview_quiz
 import json
 from utils.helpers import is_valid_url
 
@@ -25,10 +26,8 @@ def render_quiz_page():
                 warning_box("Please enter some text to generate a quiz from")
                 return
                 
-            with st.spinner("Generating quiz..."):
-                quiz = generate_quiz(content=text_content, num_questions=num_questions)
-                
-            display_quiz(quiz)
+            submit_job("quiz_job", "quiz", preview=lambda: preview_quiz(content=text_content, num_questions=num_questions),
+                       content=text_content, num_questions=num_questions)
     
     with tab2:
         url = st.text_input(
@@ -47,10 +46,21 @@ def render_quiz_page():
                 warning_box("Please enter a valid URL")
                 return
                 
-            with st.spinner("Fetching content and generating quiz..."):
-                quiz = generate_quiz(url=url, num_questions=num_questions)
-                
-            display_quiz(quiz)
+            submit_job("quiz_job", "quiz", url=url, num_questions=num_questions)
+    
+    job = follow_job("quiz_job", render_partial=display_quiz_preview, message="Generating quiz...")
+    if job:
+        display_quiz(job["result"])
+        regenerate_button("quiz_job", job)
+
+def display_quiz_preview(quiz_data):
+    section_header("Your Quiz")
+    
+    for i, question in enumerate(quiz_data):
+        st.subheader(f"Question {i+1}")
+        st.write(question.get("question", ""))
+        for option in question.get("options", []):
+            st.write(f"- {option}")
 
 def display_quiz(quiz_data):
     if not quiz_data:
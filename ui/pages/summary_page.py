@@ -1,6 +1,7 @@
 import streamlit as st
-from backend.summarization import summarize_content
 from ui.styles import main_header, section_header, warning_box, success_box
+from ui.components.jobs import submit_job, follow_job, regenerate_button
+from backend.summarization import preview_summary
 import re
 from utils.helpers import is_valid_url
 
@@ -23,21 +24,8 @@ def render_summary_page():
                 warning_box("Please enter some text to summarize")
                 return
                 
-            with st.spinner("Generating summary..."):
-                summary = summarize_content(content=text_content)
-                
-            if summary:
-                section_header("Summary")
-                st.write(summary)
-                
-                st.download_button(
-                    label="Download Summary",
-                    data=summary,
-                    file_name="summary.txt",
-                    mime="text/plain"
-                )
-            else:
-                warning_box("Could not generate summary. Please try with different content.")
+            submit_job("summary_job", "summary", preview=lambda: preview_summary(content=text_content),
+                       content=text_content)
     
     with tab2:
         url = st.text_input(
@@ -54,18 +42,29 @@ def render_summary_page():
                 warning_box("Please enter a valid URL")
                 return
                 
-            with st.spinner("Fetching content and generating summary..."):
-                summary = summarize_content(url=url)
-                
-            if summary and not summary.startswith("Error"):
-                section_header("Summary")
-                st.write(summary)
-                
-                st.download_button(
-                    label="Download Summary",
-                    data=summary,
-                    file_name="summary.txt",
-                    mime="text/plain"
-                )
-            else:
-                warning_box(f"Could not generate summary: {summary}")
\ No newline at end of file
+            submit_job("summary_job", "summary", url=url)
+    
+    job = follow_job("summary_job", render_partial=display_partial_summary, message="Generating summary...")
+    if job:
+        display_summary(job)
+        regenerate_button("summary_job", job)
+
+def display_partial_summary(partial):
+    section_header("Summary")
+    st.write(partial)
+
+def display_summary(job):
+    summary = job["result"]
+    
+    if job["status"] == "done" and summary and not summary.startswith("Error"):
+        section_header("Summary")
+        st.write(summary)
+        
+        st.download_button(
+            label="Download Summary",
+            data=summary,
+            file_name="summary.txt",
+            mime="text/plain"
+        )
+    else:
+        warning_box(f"Could not generate summary: {summary or job['error']}")
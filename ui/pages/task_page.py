@@ -1,6 +1,6 @@
 import streamlit as st
-from backend.task_manager import break_task
 from ui.styles import main_header, task_item, section_header, warning_box
+from ui.components.jobs import submit_job, follow_job, regenerate_button
 
 def render_task_page():
     main_header("Task Breakdown")
@@ -25,15 +25,15 @@ def render_task_page():
             warning_box("Please enter a task description")
             return
             
-        with st.spinner("Breaking down your task..."):
-            steps = break_task(task_description)
-            
+        submit_job("task_job", "task", task_description=task_description)
+    
+    job = follow_job("task_job", render_partial=display_steps, message="Breaking down your task...")
+    if job:
+        steps = job["result"] or []
+        
         if steps:
-            section_header("Here's your task breakdown:")
+            display_steps(steps)
             
-            for i, step in enumerate(steps, 1):
-                task_item(step, i)
-                
             st.download_button(
                 label="Download Task Breakdown",
                 data="\n".join([f"{i+1}. {step}" for i, step in enumerate(steps)]),
@@ -41,4 +41,11 @@ def render_task_page():
                 mime="text/plain"
             )
         else:
-            warning_box("Could not generate steps. Please try rewording your task.")
\ No newline at end of file
+            warning_box("Could not generate steps. Please try rewording your task.")
+        regenerate_button("task_job", job)
+
+def display_steps(steps):
+    section_header("Here's your task breakdown:")
+    
+    for i, step in enumerate(steps, 1):
+        task_item(step, i)
\ No newline at end of file
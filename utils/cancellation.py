@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+class Cancelled(BaseException):
+    """Raised inside work whose result nobody is waiting for any more.
+
+    Like asyncio's CancelledError it is not an Exception, so the feature
+    modules' catch-all fallbacks do not turn it into a simplified result.
+    """
+
+class CancelToken:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self) -> None:
+        self.event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_abandoned = Counter()
+_cancelled_runs = 0
+
+def current_token() -> Optional[CancelToken]:
+    return getattr(_local, "token", None)
+
+@contextmanager
+def cancellation_scope(token: Optional[CancelToken]) -> Iterator[None]:
+    """Makes ``token`` the current token for work started by this thread."""
+    previous = current_token()
+    _local.token = token
+    try:
+        yield
+    finally:
+        _local.token = previous
+
+def record_abandoned(stage: str, count: int = 1) -> None:
+    with _stats_lock:
+        _abandoned[stage] += count
+
+def check_cancelled(stage: str, token: CancelToken = None) -> None:
+    """Raises Cancelled at a stage boundary if the current work was cancelled."""
+    token = token or current_token()
+    if token is not None and token.cancelled:
+        record_abandoned(stage)
+        raise Cancelled(stage)
+
+class CancelledCriteria:
+    """Generation stopping criterion that fires once every request in the batch is cancelled."""
+
+    def __init__(self, tokens: List[Optional[CancelToken]]):
+        self.tokens = tokens
+
+    def __call__(self, input_ids: Any, scores: Any, **kwargs) -> bool:
+        return all(token is not None and token.cancelled for token in self.tokens)
+
+_runs: Dict[str, CancelToken] = {}
+_runs_lock = threading.Lock()
+
+def _supersede(token: CancelToken) -> None:
+    global _cancelled_runs
+    if not token.cancelled:
+        token.cancel()
+        with _stats_lock:
+            _cancelled_runs += 1
+
+def begin_script_run(session_id: str) -> CancelToken:
+    """Returns the token for a new script run of the session.
+
+    Streamlit starts a new run on every widget change, so anything still
+    working for an earlier run of the same session has been superseded and is
+    cancelled.
+    """
+    token = CancelToken()
+    with _runs_lock:
+        previous = _runs.get(session_id)
+        _runs[session_id] = token
+    if previous is not None:
+        _supersede(previous)
+    return token
+
+def end_script_run(session_id: str, token: CancelToken, completed: bool) -> None:
+    """Closes a run; a run that was interrupted by a rerun or stop cancels its leftover work."""
+    with _runs_lock:
+        if _runs.get(session_id) is token:
+            del _runs[session_id]
+    if not completed:
+        _supersede(token)
+
+def cancellation_metrics() -> Dict[str, Any]:
+    with _stats_lock:
+        return {"superseded_runs": _cancelled_runs, "abandoned": dict(_abandoned)}
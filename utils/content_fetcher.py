@@ -4,25 +4,41 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
 from typing import Union
+from utils.process_pool import run_cpu_bound
+
+# Messages the fetchers return in place of content
+FETCH_ERROR_PREFIXES = (
+    "Error", "No readable content found", "Invalid YouTube URL", "YouTube API key not configured",
+    "No captions available", "YouTube video detected"
+)
+
+def is_fetch_error(text: str) -> bool:
+    """True when ``text`` is a fetcher's error or placeholder message rather than content."""
+    return text.startswith(FETCH_ERROR_PREFIXES)
+
+def extract_text_from_html(html: str) -> str:
+    """Extracts readable text from an HTML document."""
+    soup = BeautifulSoup(html, "html.parser")
+    
+    for tag in soup(['script', 'style', 'header', 'footer', 'nav']):
+        tag.decompose()
+        
+    paragraphs = soup.find_all("p")
+    text = "\n".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+    
+    if not text:
+        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+        if main_content:
+            text = main_content.get_text(separator="\n", strip=True)
+    
+    return text
 
 def fetch_webpage_content(url: str) -> str:
     """Fetches content from a webpage."""
     try:
         response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        for tag in soup(['script', 'style', 'header', 'footer', 'nav']):
-            tag.decompose()
-            
-        paragraphs = soup.find_all("p")
-        text = "\n".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-        
-        if not text:
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
-            if main_content:
-                text = main_content.get_text(separator="\n", strip=True)
-            
+        text = run_cpu_bound(extract_text_from_html, response.text)
         return text if text else "No readable content found."
     except requests.RequestException as e:
         return f"Error fetching webpage: {e}"
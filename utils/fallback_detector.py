@@ -1,17 +1,24 @@
+from importlib.util import find_spec
+
 USING_FALLBACK = False
 
-def haystack_available():
+def module_available(name):
+    # find_spec only locates the package, it does not import it
     try:
-        import haystack
-        return True
-    except ImportError:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
         return False
 
+def haystack_available():
+    return module_available("haystack")
+
 HAYSTACK_AVAILABLE = haystack_available()
+YOUTUBE_API_AVAILABLE = module_available("googleapiclient")
 USING_FALLBACK = not HAYSTACK_AVAILABLE
 
 def check_dependencies():
     return {
         "haystack": HAYSTACK_AVAILABLE,
+        "youtube_api": YOUTUBE_API_AVAILABLE,
         "fallback_mode": USING_FALLBACK
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,68 @@
+import multiprocessing as mp
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable
+from config import PROCESS_POOL_SIZE, PROCESS_POOL_INLINE_THRESHOLD
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Returns the process-wide pool used for CPU-bound parsing and chunking."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=PROCESS_POOL_SIZE,
+                    mp_context=mp.get_context("spawn")
+                )
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _run_shared(func: Callable[..., Any], name: str, size: int, args: tuple) -> Any:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # The parent owns the segment, so the worker must not let its
+        # resource tracker unlink it on exit.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    try:
+        text = bytes(shm.buf[:size]).decode("utf-8")
+    finally:
+        shm.close()
+    return func(text, *args)
+
+def run_cpu_bound(func: Callable[..., Any], text: str, *args) -> Any:
+    """Runs ``func(text, *args)`` in the shared process pool.
+
+    Inputs below PROCESS_POOL_INLINE_THRESHOLD characters run inline, where the
+    pool round trip would cost more than the work. Larger inputs are handed over
+    through a shared memory buffer instead of being pickled to the worker.
+    ``func`` must be a module-level function so the worker can import it.
+    """
+    if not text or PROCESS_POOL_SIZE <= 0 or len(text) < PROCESS_POOL_INLINE_THRESHOLD:
+        return func(text, *args)
+
+    data = text.encode("utf-8")
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        try:
+            return get_pool().submit(_run_shared, func, shm.name, len(data), args).result()
+        except BrokenProcessPool:
+            shutdown_pool()
+            return func(text, *args)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    """Coalesces identical in-flight work across all sessions in the process.
+
+    The first caller for a key does the work; callers arriving while it runs
+    wait on the same future and receive its result or its exception.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, Future] = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """Returns the future for ``key`` and whether the caller must compute it."""
+        with self.lock:
+            future = self.calls.get(key)
+            if future is not None:
+                self.stats["followers"] += 1
+                return future, False
+            future = Future()
+            self.calls[key] = future
+            self.stats["leaders"] += 1
+            return future, True
+
+    def finish(self, key: Hashable, result: Any = None, error: BaseException = None) -> None:
+        with self.lock:
+            future = self.calls.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+
+single_flight = SingleFlight()